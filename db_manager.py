@@ -4,8 +4,86 @@
 """
 
 import duckdb
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Tuple, Iterator, Union
 import pandas as pd
+import pyarrow as pa
+
+
+def _bit_to_text(value: Optional[bytes]) -> Optional[str]:
+    """将 DuckDB BIT 值的内部表示（首字节为填充位数，其余字节为位串）转换为 '101' 形式的字符串"""
+    if value is None:
+        return None
+    bits = ''.join(format(byte, '08b') for byte in value[1:])
+    return bits[value[0]:]
+
+
+def _bit_columns(result: Union[duckdb.DuckDBPyConnection, duckdb.DuckDBPyRelation]) -> List[int]:
+    """
+    返回查询结果中 BIT 列的下标（BIT 在 Arrow 中是普通二进制，只能根据 DuckDB 的列类型识别）
+    旧版本 DuckDB 游标的 description 中 BIT 与 BLOB 都显示为 BINARY，需要识别 BIT 时使用关系
+    """
+    if isinstance(result, duckdb.DuckDBPyRelation):
+        type_names = [str(t) for t in result.types]
+    else:
+        type_names = [str(desc[1]) for desc in result.description or []]
+    return [i for i, type_name in enumerate(type_names) if type_name == 'BIT']
+
+
+def _decode_bit_columns(data, bit_columns: List[int]):
+    """将 Arrow 表或记录批次中的 BIT 列转换为字符串列，与 DuckDB 直接取出和 COPY 导出的结果一致"""
+    if not bit_columns:
+        return data
+    arrays = list(data.columns)
+    for i in bit_columns:
+        arrays[i] = pa.array([_bit_to_text(v) for v in arrays[i].to_pylist()], type=pa.string())
+    return type(data).from_arrays(arrays, names=data.schema.names)
+
+
+def fetch_arrow_table(result: Union[duckdb.DuckDBPyConnection, duckdb.DuckDBPyRelation]) -> pa.Table:
+    """
+    将查询结果（游标或关系）取为 Arrow 表（兼容新旧版本 DuckDB 的方法名），BIT 列转换为字符串
+    在类型上检查方法是否存在：关系对象上不存在的属性会被当作列名查找
+    """
+    bit_columns = _bit_columns(result)
+    if hasattr(type(result), 'to_arrow_table'):
+        table = result.to_arrow_table()
+    else:
+        table = result.fetch_arrow_table()
+    return _decode_bit_columns(table, bit_columns)
+
+
+def fetch_record_batch_reader(result: Union[duckdb.DuckDBPyConnection, duckdb.DuckDBPyRelation],
+                              rows_per_batch: int = 1024) -> pa.RecordBatchReader:
+    """
+    将查询结果（游标或关系）取为按批流式读取的 RecordBatchReader（兼容新旧版本 DuckDB 的方法名），
+    BIT 列逐批转换为字符串
+    """
+    bit_columns = _bit_columns(result)
+    if hasattr(type(result), 'to_arrow_reader'):
+        reader = result.to_arrow_reader(rows_per_batch)
+    elif isinstance(result, duckdb.DuckDBPyRelation):
+        # 旧版本 DuckDB 的关系对象只有 record_batch
+        reader = result.record_batch(rows_per_batch)
+    else:
+        reader = result.fetch_record_batch(rows_per_batch)
+    if not bit_columns:
+        return reader
+    
+    schema = reader.schema
+    for i in bit_columns:
+        schema = schema.set(i, schema.field(i).with_type(pa.string()))
+    return pa.RecordBatchReader.from_batches(
+        schema, (_decode_bit_columns(batch, bit_columns) for batch in reader)
+    )
+
+
+def _sql_string_literal(value: str) -> str:
+    """将字符串写成 SQL 字符串字面量（单引号转义）；旧版本 DuckDB 的 COPY ... TO 不支持用 ? 绑定文件路径"""
+    return "'" + value.replace("'", "''") + "'"
+
+
+# COPY ... TO 支持的导出格式对应的选项（CSV 带表头，JSON 每行一条记录）
+_COPY_OPTIONS = {'csv': "FORMAT CSV, HEADER", 'json': "FORMAT JSON"}
 
 
 class DatabaseManager:
@@ -15,6 +93,61 @@ class DatabaseManager:
         """初始化数据库连接（使用内存数据库）"""
         self.conn = duckdb.connect()
         self.last_error: Optional[str] = None
+        self._configure_connection()
+    
+    def _configure_connection(self):
+        """
+        调整连接的缓存设置
+        
+        加载文件夹时会先逐个探测文件 schema 再整体读取，同一批 Parquet 文件的元数据会被读取多次，
+        开启元数据缓存避免重复解析文件尾。旧版本 DuckDB（如 1.0）没有该设置，此时不做任何事。
+        """
+        try:
+            supported = self.conn.execute(
+                "SELECT 1 FROM duckdb_settings() WHERE name = 'parquet_metadata_cache'"
+            ).fetchone()
+            if supported:
+                self.conn.execute("SET parquet_metadata_cache = true")
+        except duckdb.Error as e:
+            print(f"无法开启 Parquet 元数据缓存: {e}")
+    
+    def execute_query_arrow(self, sql: str, params: Optional[List[Any]] = None) -> Optional[pa.Table]:
+        """
+        执行 SQL 查询并返回 Arrow 表（零拷贝，不经过 pandas 转换）
+        失败时的错误信息保存在 last_error 中；多个线程同时查询时使用 run_query_arrow
+        
+        Args:
+            sql: SQL 查询语句
+            params: 绑定到 ? 占位符的参数
+            
+        Returns:
+            查询结果 Arrow 表，如果失败返回 None
+        """
+        table, self.last_error = self.run_query_arrow(sql, params)
+        return table
+    
+    def run_query_arrow(self, sql: str,
+                        params: Optional[List[Any]] = None) -> Tuple[Optional[pa.Table], Optional[str]]:
+        """
+        在独立游标上执行 SQL 查询并返回 Arrow 表
+        错误信息随结果一起返回，不保存在共享状态中，可在任意线程调用
+        
+        Args:
+            sql: SQL 查询语句
+            params: 绑定到 ? 占位符的参数
+            
+        Returns:
+            (查询结果 Arrow 表, 错误信息)，成功时错误信息为 None，失败时结果为 None
+        """
+        cursor = self.conn.cursor()
+        try:
+            return fetch_arrow_table(cursor.execute(sql, params)), None
+        except Exception as e:
+            error_msg = str(e)
+            print(f"查询执行失败: {error_msg}")
+            return None, error_msg
+        finally:
+            cursor.close()
     
     def execute_query(self, sql: str) -> Optional[pd.DataFrame]:
         """
@@ -26,46 +159,195 @@ class DatabaseManager:
         Returns:
             查询结果 DataFrame，如果失败返回 None
         """
+        cursor = self.conn.cursor()
         try:
-            result = self.conn.execute(sql)
+            result = cursor.execute(sql).df()
             self.last_error = None
-            return result.df()
+            return result
         except Exception as e:
             error_msg = str(e)
             self.last_error = error_msg
             print(f"查询执行失败: {error_msg}")
             return None
+        finally:
+            cursor.close()
     
-    def execute_query_dict(self, sql: str) -> Optional[List[Dict[str, Any]]]:
+    def execute_query_dict(self, sql: str, params: Optional[List[Any]] = None) -> Optional[List[Dict[str, Any]]]:
         """
         执行 SQL 查询并返回字典列表
         
         Args:
             sql: SQL 查询语句
+            params: 绑定到 ? 占位符的参数
             
         Returns:
             查询结果字典列表，如果失败返回 None
         """
+        table = self.execute_query_arrow(sql, params)
+        if table is None:
+            return None
+        # 通过 Arrow 列式缓冲区直接生成字典列表，避免逐行 zip
+        return table.to_pylist()
+    
+    def iter_query(self, sql: str, chunk_size: int = 8192) -> Tuple[List[str], Iterator[List[tuple]]]:
+        """
+        在独立游标上执行查询，并分批流式返回结果行，不一次性加载完整结果
+        
+        Args:
+            sql: SQL 查询语句
+            chunk_size: 每批行数
+            
+        Returns:
+            (列名列表, 按批返回行元组列表的迭代器)
+        """
+        cursor = self.conn.cursor()
         try:
-            result = self.conn.execute(sql)
-            rows = result.fetchall()
-            # description 返回 (name, type, ...) 元组列表
-            columns = [desc[0] for desc in result.description]
+            cursor.execute(sql)
+        except Exception:
+            cursor.close()
+            raise
+        headers = [desc[0] for desc in cursor.description]
+        
+        def chunks():
+            try:
+                while True:
+                    rows = cursor.fetchmany(chunk_size)
+                    if not rows:
+                        break
+                    yield rows
+            finally:
+                cursor.close()
+        
+        return headers, chunks()
+    
+    def copy_query_to(self, sql: str, file_path: str, file_format: str) -> bool:
+        """
+        使用 DuckDB 原生的 COPY ... TO 将查询结果直接写入文件（序列化在 DuckDB 内部完成，不经过 Python）
+        
+        查询在独立游标上以关系（relation）方式执行，结果流注册为临时视图后由另一个游标 COPY 写出，
+        不把原始 SQL 文本拼接进 COPY 语句（PRAGMA、SHOW 或带结尾注释的语句无法作为子查询）
+        
+        Args:
+            sql: 单条查询语句
+            file_path: 导出文件路径
+            file_format: 'csv'（带表头）或 'json'（每行一条记录）
             
-            self.last_error = None
-            return [dict(zip(columns, row)) for row in rows]
+        Returns:
+            是否成功
+        """
+        options = _COPY_OPTIONS[file_format]
+        source = self.conn.cursor()
+        cursor = self.conn.cursor()
+        try:
+            relation = source.sql(sql)
+            if relation is None:
+                raise ValueError("不是查询语句")
+            cursor.register('_export_source', fetch_record_batch_reader(relation, 8192))
+            cursor.execute(f"COPY _export_source TO {_sql_string_literal(file_path)} ({options})")
+            return True
+        except Exception as e:
+            print(f"COPY 导出失败: {e}")
+            return False
+        finally:
+            cursor.close()
+            source.close()
+    
+    def copy_table_to(self, table_name: str, file_path: str, file_format: str) -> bool:
+        """
+        使用 COPY <表> TO 将整张表直接写入文件（序列化在 DuckDB 内部完成，不经过 Python）
+        
+        Args:
+            table_name: 表名（只能是 FileManager 生成并校验过的表名，会直接插值到 SQL 中）
+            file_path: 导出文件路径
+            file_format: 'csv'（带表头）或 'json'（每行一条记录）
+            
+        Returns:
+            是否成功
+        """
+        options = _COPY_OPTIONS[file_format]
+        cursor = self.conn.cursor()
+        try:
+            cursor.execute(f"COPY {table_name} TO {_sql_string_literal(file_path)} ({options})")
+            return True
+        except Exception as e:
+            print(f"COPY 导出失败: {e}")
+            return False
+        finally:
+            cursor.close()
+    
+    def is_single_select(self, sql: str) -> bool:
+        """
+        判断 SQL 是否为单条查询语句（可以分页读取或重复执行）
+        
+        PRAGMA、SHOW、DESCRIBE 等语句也被解析为查询语句，分页和统计行数时通过关系 API 处理，
+        不对原始 SQL 文本做字符串包装
+        
+        Args:
+            sql: SQL 语句
+            
+        Returns:
+            是否为单条查询语句
+        """
+        try:
+            statements = duckdb.extract_statements(sql)
+        except Exception:
+            return False
+        return len(statements) == 1 and statements[0].type == duckdb.StatementType.SELECT
+    
+    def count_query_rows(self, sql: str) -> Optional[int]:
+        """
+        在独立游标上统计单条查询语句的结果行数
+        
+        Args:
+            sql: 单条查询语句
+            
+        Returns:
+            结果行数，如果失败返回 None
+        """
+        cursor = self.conn.cursor()
+        try:
+            relation = cursor.sql(sql)
+            if relation is None:
+                return None
+            return relation.aggregate('count(*)').fetchone()[0]
+        except Exception as e:
+            print(f"统计查询行数失败: {e}")
+            return None
+        finally:
+            cursor.close()
+    
+    def fetch_query_page(self, sql: str, limit: int,
+                         offset: int) -> Tuple[Optional[pa.Table], Optional[str]]:
+        """
+        在独立游标上读取单条查询语句结果中从 offset 开始的一页
+        
+        Args:
+            sql: 单条查询语句
+            limit: 每页行数
+            offset: 起始行偏移
+            
+        Returns:
+            (该页结果 Arrow 表, 错误信息)，成功时错误信息为 None，失败时结果为 None
+        """
+        cursor = self.conn.cursor()
+        try:
+            relation = cursor.sql(sql)
+            if relation is None:
+                raise ValueError("不是查询语句")
+            return fetch_arrow_table(relation.limit(limit, offset)), None
         except Exception as e:
             error_msg = str(e)
-            self.last_error = error_msg
             print(f"查询执行失败: {error_msg}")
-            return None
+            return None, error_msg
+        finally:
+            cursor.close()
     
     def get_connection(self) -> duckdb.DuckDBPyConnection:
         """获取数据库连接"""
         return self.conn
     
     def get_last_error(self) -> Optional[str]:
-        """获取最后一次查询的错误信息"""
+        """获取最后一次 execute_query / execute_query_arrow 查询的错误信息"""
         return self.last_error
     
     def close(self):
@@ -3,12 +3,67 @@
 负责加载和管理 JSON、Parquet、CSV 格式的文件
 """
 
+import mmap
 import os
-import json
+import re
+import string
+import threading
 import duckdb
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
-from typing import List, Dict, Optional
-import pandas as pd
+from typing import List, Dict, Optional, FrozenSet, Set, Tuple, Iterator, Union
+import pyarrow as pa
+
+# 优先使用 orjson（Rust 实现，解析更快），未安装时回退到标准库
+try:
+    import orjson as _json
+    _HAS_ORJSON = True
+except ImportError:
+    import json as _json
+    _HAS_ORJSON = False
+
+from db_manager import fetch_record_batch_reader
+
+
+# 表名中不允许出现的字符，以及允许作为表名开头的字符
+_IDENT_RE = re.compile(r'[^A-Za-z0-9_]')
+_IDENT_START_CHARS = frozenset(string.ascii_letters + '_')
+
+# 支持的文件扩展名（元组形式，可直接用于 str.endswith）
+_SUPPORTED_EXTS = ('.csv', '.parquet', '.json')
+
+# 需要跳过的隐藏文件和系统文件前缀（macOS 的 ._ 文件等）
+_HIDDEN_PREFIXES = ('._', '.DS_Store')
+
+# DuckDB JSON 读取器单个对象的最大字节数（默认 16MB，放宽以支持较大的记录）
+JSON_MAX_OBJECT_SIZE = 256 * 1024 * 1024
+
+# 预览结果缓存的最大条目数（按 (文件, 行数) 缓存，超出时淘汰最久未使用的）
+PREVIEW_CACHE_SIZE = 64
+
+
+def _prewarm_files(paths: List[str]):
+    """
+    提示内核预读文件（POSIX_FADV_WILLNEED），预读在内核中异步进行，不阻塞调用方，
+    随后 DuckDB 读取文件时尽量命中页缓存；不支持 posix_fadvise 的平台上不做任何事
+    
+    Args:
+        paths: 文件路径列表
+    """
+    if not hasattr(os, 'posix_fadvise'):
+        return
+    for path in paths:
+        try:
+            fd = os.open(path, os.O_RDONLY)
+        except OSError:
+            continue
+        try:
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_WILLNEED)
+        except OSError:
+            pass
+        finally:
+            os.close(fd)
 
 
 class FileManager:
@@ -24,6 +79,26 @@ class FileManager:
         self.conn = db_connection
         self.loaded_files: Dict[str, str] = {}  # 文件名 -> 表名映射
         self.file_aliases: Dict[str, str] = {}  # 文件名 -> 别名映射
+        self._name_cache: Optional[Set[str]] = None  # 已存在的表名（小写），按需从目录加载
+        self.row_counts: Dict[str, int] = {}  # 文件名 -> 行数缓存（已加载的表内容不变，只需统计一次）
+        # (文件名, 预览行数) -> 预览结果缓存，按最近使用顺序排列
+        self._preview_cache: "OrderedDict[Tuple[str, int], pa.Table]" = OrderedDict()
+        self._local = threading.local()  # 每个线程各自的游标
+        # 加载线程和主线程都会读写上面的映射和缓存：只在读写这些状态时持有锁，执行建表等耗时查询时不持有，
+        # 加载大文件期间主线程仍可预览其他文件
+        self._lock = threading.RLock()
+        self._loading_names: Set[str] = set()  # 正在加载中的表名（小写），生成表名时视为已存在
+    
+    def _cursor(self) -> duckdb.DuckDBPyConnection:
+        """
+        获取当前线程专用的游标（首次使用时创建）
+        同一个连接对象不能被多个线程同时执行查询，加载线程和主线程各自使用自己的游标，结果不会串用
+        """
+        cursor = getattr(self._local, 'cursor', None)
+        if cursor is None:
+            cursor = self.conn.cursor()
+            self._local.cursor = cursor
+        return cursor
     
     def load_file(self, file_path: str, alias: Optional[str] = None) -> Optional[str]:
         """
@@ -41,47 +116,33 @@ class FileManager:
             if not path.exists():
                 return None
             
-            # 如果没有提供别名，使用文件名生成表名
-            if alias is None:
-                table_name = self.generate_table_name(path.stem)
-            else:
-                # 使用别名作为表名，但需要验证和清理
-                table_name = self.generate_table_name(alias)
-            
-            # 根据文件类型加载
             file_ext = path.suffix.lower()
+            if file_ext not in _SUPPORTED_EXTS:
+                return None
             
-            # 转义文件路径中的单引号
-            escaped_path = file_path.replace("'", "''")
-            
-            if file_ext == '.csv':
-                self.conn.execute(f"CREATE OR REPLACE TABLE {table_name} AS SELECT * FROM read_csv_auto('{escaped_path}')")
-            elif file_ext == '.parquet':
-                self.conn.execute(f"CREATE OR REPLACE TABLE {table_name} AS SELECT * FROM read_parquet('{escaped_path}')")
-            elif file_ext == '.json':
-                # JSON 文件解析：将每个key作为单独的一列
-                json_data = self._load_json_file(Path(file_path))
-                
-                if not json_data:
-                    raise ValueError(f"JSON文件 {path.name} 无法解析或为空")
+            # 如果没有提供别名，使用文件名生成表名；否则使用别名作为表名，但需要验证和清理
+            table_name = self._reserve_table_name(path.stem if alias is None else alias)
+            try:
+                # 根据文件类型加载
+                _prewarm_files([file_path])
                 
-                # 转换为DataFrame，每个key作为一列
-                df = pd.DataFrame(json_data)
+                # 文件路径通过参数绑定传入，表名由 generate_table_name 清理
+                if file_ext == '.csv':
+                    self._cursor().execute(
+                        f"CREATE OR REPLACE TABLE {table_name} AS SELECT * FROM read_csv_auto(?)", [file_path]
+                    )
+                elif file_ext == '.parquet':
+                    self._cursor().execute(
+                        f"CREATE OR REPLACE TABLE {table_name} AS SELECT * FROM read_parquet(?)", [file_path]
+                    )
+                else:
+                    # JSON 文件解析：将每个key作为单独的一列
+                    self._create_json_table(table_name, path)
                 
-                # 注册DataFrame并创建表
-                self.conn.register('df', df)
-                self.conn.execute(f"CREATE OR REPLACE TABLE {table_name} AS SELECT * FROM df")
-                self.conn.unregister('df')
-            else:
-                return None
-            
-            # 记录已加载的文件
-            self.loaded_files[file_path] = table_name
-            
-            # 保存别名（用于显示）
-            if alias is None:
-                alias = table_name
-            self.file_aliases[file_path] = alias
+                # 记录已加载的文件（重新加载时旧的行数缓存失效）和别名（用于显示）
+                self._register_loaded(file_path, table_name, table_name if alias is None else alias)
+            finally:
+                self._release_table_name(table_name)
             
             return table_name
             
@@ -106,128 +167,315 @@ class FileManager:
         if not path.is_dir():
             return None
         
-        # 支持的文件扩展名
-        supported_extensions = {'.csv', '.parquet', '.json'}
-        
-        # 收集所有支持的文件，过滤掉隐藏文件和系统文件
-        files = []
-        for file_path in path.rglob('*'):
-            # 跳过隐藏文件和系统文件（macOS 的 ._ 文件等）
-            if file_path.name.startswith('._') or file_path.name.startswith('.DS_Store'):
-                continue
-            if file_path.is_file() and file_path.suffix.lower() in supported_extensions:
-                files.append(file_path)
+        # 边遍历边检查所有文件格式是否一致（遇到不一致立即停止），只保留路径字符串
+        files: List[str] = []
+        file_ext = None
+        for file_path in self._iter_data_files(dir_path, _SUPPORTED_EXTS):
+            ext = os.path.splitext(file_path)[1].lower()
+            if file_ext is None:
+                file_ext = ext
+            elif ext != file_ext:
+                raise ValueError(f"文件夹中的文件格式不一致：{file_ext}、{ext}。所有文件必须使用相同的格式。")
+            files.append(file_path)
         
         if not files:
             raise ValueError("文件夹中没有找到支持的文件格式（CSV、Parquet、JSON）")
         
-        # 检查所有文件格式是否一致
-        file_exts = {f.suffix.lower() for f in files}
-        if len(file_exts) > 1:
-            raise ValueError(f"文件夹中的文件格式不一致：{file_exts}。所有文件必须使用相同的格式。")
-        
-        file_ext = list(file_exts)[0]
+        # 让内核提前把所有文件读入页缓存，与下面的 schema 探测并行进行
+        _prewarm_files(files)
         
-        # 生成表名
-        if alias is None:
-            table_name = self.generate_table_name(path.name)
-        else:
-            table_name = self.generate_table_name(alias)
+        # 生成表名（加载完成前保留，避免同时进行的其他加载使用同一个表名）
+        table_name = self._reserve_table_name(path.name if alias is None else alias)
         
         # 检查schema一致性并合并文件
         try:
-            if file_ext == '.csv':
-                # 读取所有CSV文件并检查schema
-                first_df = pd.read_csv(files[0])
-                first_columns = set(first_df.columns)
-                
-                # 检查其他文件的schema
-                for file_path in files[1:]:
-                    df = pd.read_csv(file_path)
-                    if set(df.columns) != first_columns:
-                        raise ValueError(
-                            f"文件 {files[0].name} 和 {file_path.name} 的列结构不一致。"
-                            f"文件1列: {sorted(first_columns)}, 文件2列: {sorted(df.columns)}"
-                        )
-                
-                # 合并所有CSV文件
-                all_dfs = [pd.read_csv(f) for f in files]
-                combined_df = pd.concat(all_dfs, ignore_index=True)
-                
-                # 注册DataFrame并创建表
-                self.conn.register('combined_df', combined_df)
-                self.conn.execute(f"CREATE OR REPLACE TABLE {table_name} AS SELECT * FROM combined_df")
-                self.conn.unregister('combined_df')
-                
-            elif file_ext == '.parquet':
-                # 读取所有Parquet文件并检查schema
-                first_df = pd.read_parquet(files[0])
-                first_columns = set(first_df.columns)
-                
-                # 检查其他文件的schema
+            try:
+                # 逐个探测文件schema（Parquet 只读文件尾元数据，CSV/JSON 只采样推断）
+                first_columns = self._probe_schema(files[0], file_ext)
+                # frozenset 的哈希与列顺序无关，先比较整数签名，相同时再做完整比较
+                first_sig = hash(first_columns)
                 for file_path in files[1:]:
-                    df = pd.read_parquet(file_path)
-                    if set(df.columns) != first_columns:
-                        raise ValueError(
-                            f"文件 {files[0].name} 和 {file_path.name} 的列结构不一致。"
-                            f"文件1列: {sorted(first_columns)}, 文件2列: {sorted(df.columns)}"
-                        )
+                    columns = self._probe_schema(file_path, file_ext)
+                    if hash(columns) != first_sig or columns != first_columns:
+                        raise self._schema_mismatch(files[0], file_path, first_columns, columns)
                 
-                # 合并所有Parquet文件
-                all_dfs = [pd.read_parquet(f) for f in files]
-                combined_df = pd.concat(all_dfs, ignore_index=True)
-                
-                # 注册DataFrame并创建表
-                self.conn.register('combined_df', combined_df)
-                self.conn.execute(f"CREATE OR REPLACE TABLE {table_name} AS SELECT * FROM combined_df")
-                self.conn.unregister('combined_df')
-                
-            elif file_ext == '.json':
-                # 读取所有JSON文件并检查schema
-                first_data = self._load_json_file(files[0])
-                if not first_data:
-                    raise ValueError(f"文件 {files[0].name} 无法解析或为空")
-                
-                first_columns = set(first_data[0].keys()) if first_data else set()
-                
-                # 检查其他文件的schema
-                all_data = [first_data]
-                for file_path in files[1:]:
-                    data = self._load_json_file(file_path)
-                    if not data:
-                        raise ValueError(f"文件 {file_path.name} 无法解析或为空")
-                    
-                    if set(data[0].keys()) != first_columns:
-                        raise ValueError(
-                            f"文件 {files[0].name} 和 {file_path.name} 的JSON结构不一致。"
-                            f"文件1键: {sorted(first_columns)}, 文件2键: {sorted(data[0].keys())}"
-                        )
-                    all_data.append(data)
-                
-                # 合并所有JSON数据
-                combined_data = []
-                for data in all_data:
-                    combined_data.extend(data)
-                
-                # 转换为DataFrame并创建表
-                combined_df = pd.DataFrame(combined_data)
-                self.conn.register('combined_df', combined_df)
-                self.conn.execute(f"CREATE OR REPLACE TABLE {table_name} AS SELECT * FROM combined_df")
-                self.conn.unregister('combined_df')
-            
-            # 记录已加载的文件（使用目录路径作为key）
-            self.loaded_files[dir_path] = table_name
+                # 所有文件交给 DuckDB 一次性读取（向量化、并行、流式），不经过 pandas
+                source = self._multi_file_source(file_ext)
+                self._cursor().execute(
+                    f"CREATE OR REPLACE TABLE {table_name} AS SELECT * FROM {source}", [files]
+                )
+            except duckdb.Error:
+                # 探测或合并读取失败时逐个文件加载：JSON 文件逐个解析（可跳过格式错误的行），
+                # 其他格式并行加载，以定位出错的文件
+                if file_ext == '.json':
+                    self._load_json_files(table_name, files)
+                else:
+                    self._load_files_parallel(table_name, files, file_ext)
             
-            # 保存别名
-            if alias is None:
-                alias = table_name
-            self.file_aliases[dir_path] = alias
+            # 记录已加载的文件（使用目录路径作为key）和别名
+            self._register_loaded(dir_path, table_name, table_name if alias is None else alias)
             
             return table_name
             
         except Exception as e:
             print(f"加载文件夹失败 {dir_path}: {e}")
             raise
+        finally:
+            self._release_table_name(table_name)
+    
+    def _register_loaded(self, file_path: str, table_name: str, alias: str):
+        """记录加载完成的文件、表名和别名，并丢弃该文件旧的缓存"""
+        with self._lock:
+            self.loaded_files[file_path] = table_name
+            self._forget_cached(file_path)
+            self._remember_table_name(table_name)
+            self.file_aliases[file_path] = alias
+    
+    @staticmethod
+    def _iter_data_files(root: str, extensions: Tuple[str, ...]) -> Iterator[str]:
+        """
+        递归遍历目录，返回指定扩展名的文件
+        使用 os.scandir 复用目录项缓存的类型信息，不为目录项创建 Path 对象
+        
+        Args:
+            root: 根目录路径
+            extensions: 小写的文件扩展名元组
+            
+        Returns:
+            文件路径迭代器
+        """
+        stack = [root]
+        while stack:
+            try:
+                entries = os.scandir(stack.pop())
+            except OSError:
+                # 跳过无法读取的目录（权限不足等）
+                continue
+            with entries:
+                for entry in entries:
+                    # 跳过隐藏文件和系统文件（macOS 的 ._ 文件等）
+                    if entry.name.startswith(_HIDDEN_PREFIXES):
+                        continue
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            stack.append(entry.path)
+                        elif entry.name.lower().endswith(extensions) and entry.is_file():
+                            yield entry.path
+                    except OSError:
+                        continue
+    
+    def _multi_file_source(self, file_ext: str) -> str:
+        """
+        生成读取多个文件的 DuckDB 表函数 SQL 片段
+        文件路径列表通过 ? 参数绑定传入
+        
+        Args:
+            file_ext: 文件扩展名
+            
+        Returns:
+            如 read_csv_auto(?, union_by_name=true) 的 SQL 片段
+        """
+        if file_ext == '.csv':
+            return "read_csv_auto(?, union_by_name=true)"
+        elif file_ext == '.parquet':
+            return "read_parquet(?, union_by_name=true, hive_partitioning=false)"
+        else:
+            return (
+                f"read_json_auto(?, format='auto', union_by_name=true, "
+                f"maximum_object_size={JSON_MAX_OBJECT_SIZE})"
+            )
+    
+    def _load_files_parallel(self, table_name: str, files: List[str], file_ext: str):
+        """
+        逐个文件并行加载到同一张表
+        先按第一个文件的结构建空表，再用独立游标并发 INSERT 其余文件
+        
+        Args:
+            table_name: 表名
+            files: 文件路径列表
+            file_ext: 文件扩展名
+        """
+        source = self._multi_file_source(file_ext)
+        
+        def insert_file(file_path: str):
+            cursor = self.conn.cursor()
+            try:
+                cursor.execute(
+                    f"INSERT INTO {table_name} BY NAME SELECT * FROM {source}", [[file_path]]
+                )
+            finally:
+                cursor.close()
+        
+        try:
+            try:
+                self._cursor().execute(
+                    f"CREATE OR REPLACE TABLE {table_name} AS SELECT * FROM {source} LIMIT 0", [files[:1]]
+                )
+            except duckdb.Error as e:
+                raise ValueError(f"文件 {os.path.basename(files[0])} 无法加载：{e}") from e
+            with ThreadPoolExecutor(max_workers=os.cpu_count()) as executor:
+                futures = {executor.submit(insert_file, f): f for f in files}
+                for future in as_completed(futures):
+                    try:
+                        future.result()
+                    except duckdb.Error as e:
+                        raise ValueError(f"文件 {os.path.basename(futures[future])} 无法加载：{e}") from e
+        except Exception:
+            self._cursor().execute(f"DROP TABLE IF EXISTS {table_name}")
+            raise
+    
+    @staticmethod
+    def _schema_mismatch(first_file: str, file_path: str,
+                         first_columns: FrozenSet[str], columns: FrozenSet[str]) -> ValueError:
+        """生成两个文件列结构不一致的错误"""
+        return ValueError(
+            f"文件 {os.path.basename(first_file)} 和 {os.path.basename(file_path)} 的列结构不一致。"
+            f"文件1列: {sorted(first_columns)}, 文件2列: {sorted(columns)}"
+        )
+    
+    def _load_json_files(self, table_name: str, files: List[str]):
+        """
+        逐个文件解析 JSON 并合并到同一张表
+        每个文件先按 _create_json_table 的方式（DuckDB 读取器失败时回退到 Python 解析并跳过格式错误的行）
+        载入临时表，检查列结构一致后再合并
+        
+        Args:
+            table_name: 表名
+            files: JSON 文件路径列表
+        """
+        staging_tables: List[str] = []
+        try:
+            first_columns = None
+            for file_path in files:
+                staging = self._reserve_table_name(f"{table_name}_part")
+                staging_tables.append(staging)
+                try:
+                    self._create_json_table(staging, Path(file_path))
+                except duckdb.Error as e:
+                    raise ValueError(f"文件 {os.path.basename(file_path)} 无法加载：{e}") from e
+                
+                columns_info = self._cursor().execute(f"DESCRIBE {staging}").fetchall()
+                columns = frozenset(col[0] for col in columns_info)
+                if first_columns is None:
+                    first_columns = columns
+                    self._cursor().execute(f"CREATE OR REPLACE TABLE {table_name} AS FROM {staging}")
+                elif columns != first_columns:
+                    raise self._schema_mismatch(files[0], file_path, first_columns, columns)
+                else:
+                    self._cursor().execute(f"INSERT INTO {table_name} BY NAME FROM {staging}")
+        except Exception:
+            self._cursor().execute(f"DROP TABLE IF EXISTS {table_name}")
+            raise
+        finally:
+            for staging in staging_tables:
+                self._cursor().execute(f"DROP TABLE IF EXISTS {staging}")
+                self._release_table_name(staging)
+    
+    def _probe_schema(self, file_path: str, file_ext: str) -> FrozenSet[str]:
+        """
+        探测单个文件的列名（DESCRIBE 只推断schema，不读取全部数据）
+        
+        Args:
+            file_path: 文件路径
+            file_ext: 文件扩展名
+            
+        Returns:
+            列名集合
+        """
+        source = self._multi_file_source(file_ext)
+        columns_info = self._cursor().execute(f"DESCRIBE SELECT * FROM {source}", [[file_path]]).fetchall()
+        return frozenset(col[0] for col in columns_info)
+    
+    def _create_json_table(self, table_name: str, path: Path):
+        """
+        使用 DuckDB 原生 JSON 读取器创建表
+        依次尝试 read_json_auto、read_ndjson_auto，均失败时回退到 Python 解析
+        
+        Args:
+            table_name: 表名
+            path: JSON文件路径
+        """
+        # 空文件（或只有空白）会被 DuckDB 读成只有一个 json 列的空表，直接报错
+        if self._is_blank_file(path):
+            raise ValueError(f"JSON文件 {path.name} 无法解析或为空")
+        
+        try:
+            self._cursor().execute(
+                f"CREATE OR REPLACE TABLE {table_name} AS SELECT * FROM read_json_auto("
+                f"?, format='auto', maximum_object_size={JSON_MAX_OBJECT_SIZE})",
+                [str(path)]
+            )
+            return
+        except duckdb.Error:
+            pass
+        
+        # 尝试按 JSONL 格式读取
+        try:
+            self._cursor().execute(
+                f"CREATE OR REPLACE TABLE {table_name} AS SELECT * FROM read_ndjson_auto("
+                f"?, maximum_object_size={JSON_MAX_OBJECT_SIZE})",
+                [str(path)]
+            )
+            return
+        except duckdb.Error:
+            pass
+        
+        # 最后回退到 Python 解析（可跳过格式错误的行）
+        json_data = self._load_json_file(path)
+        
+        if not json_data:
+            raise ValueError(f"JSON文件 {path.name} 无法解析或为空")
+        
+        # 直接构建 Arrow 表交给 DuckDB，不经过 DataFrame
+        arrow_table = self._records_to_arrow(json_data)
+        
+        # 在独立游标上用一个事务完成注册和建表，合并目录更新，且不影响主连接的事务状态
+        cursor = self.conn.cursor()
+        try:
+            cursor.begin()
+            cursor.register('json_records', arrow_table)
+            cursor.execute(f"CREATE OR REPLACE TABLE {table_name} AS FROM json_records")
+            cursor.unregister('json_records')
+            cursor.commit()
+        except Exception:
+            cursor.rollback()
+            raise
+        finally:
+            cursor.close()
+    
+    @staticmethod
+    def _is_blank_file(path: Path, block_size: int = 65536) -> bool:
+        """判断文件是否为空或只包含空白字符（读到第一个非空白字节即停止）"""
+        with open(path, 'rb') as f:
+            while True:
+                block = f.read(block_size)
+                if not block:
+                    return True
+                if block.strip():
+                    return False
+    
+    @staticmethod
+    def _records_to_arrow(records: List[Dict]) -> pa.Table:
+        """
+        将字典列表按列转换为 Arrow 表
+        列为所有记录键的并集（按首次出现顺序），缺失的键填充为 null
+        
+        Args:
+            records: JSON对象列表
+            
+        Returns:
+            Arrow 表
+        """
+        columns = list(dict.fromkeys(key for record in records for key in record))
+        arrays = []
+        for column in columns:
+            values = [record.get(column) for record in records]
+            try:
+                arrays.append(pa.array(values))
+            except (pa.ArrowInvalid, pa.ArrowTypeError):
+                # 同一列中类型混杂时按文本处理
+                arrays.append(pa.array([None if v is None else str(v) for v in values], type=pa.string()))
+        return pa.Table.from_arrays(arrays, names=columns)
     
     def _load_json_file(self, file_path: Path) -> List[Dict]:
         """
@@ -240,36 +488,77 @@ class FileManager:
         Returns:
             JSON对象列表
         """
-        data = []
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read().strip()
+            # 空文件无法建立内存映射
+            if os.path.getsize(file_path) == 0:
+                return []
+            
+            # 以只读内存映射打开文件，按行解析时只复制单行，避免整个文件在 Python 堆中多一份拷贝
+            with open(file_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                # 第一行就是完整的JSON对象时直接按行解析（JSONL格式），避免先整体解析失败
+                if self._looks_like_jsonl(mm):
+                    return self._parse_json_lines(mm)
                 
                 # 尝试解析为JSON数组
                 try:
-                    json_array = json.loads(content)
+                    json_array = self._loads_mapped(mm)
                     if isinstance(json_array, list):
                         data = json_array
                     else:
                         # 单个对象，转为列表
                         data = [json_array]
-                except json.JSONDecodeError:
-                    # 尝试按行解析（JSONL格式）
-                    f.seek(0)
-                    for line in f:
-                        line = line.strip()
-                        if line:
-                            try:
-                                obj = json.loads(line)
-                                data.append(obj)
-                            except json.JSONDecodeError:
-                                continue
+                except ValueError:
+                    # 尝试按行解析（JSONL格式），直接复用已映射的内容
+                    data = self._parse_json_lines(mm)
         except Exception as e:
             print(f"解析JSON文件失败 {file_path}: {e}")
             return []
         
         return data
     
+    @staticmethod
+    def _loads_mapped(mm: mmap.mmap):
+        """解析整个内存映射内容：orjson 可直接读取缓冲区，标准库 json 需要先复制为 bytes"""
+        if not _HAS_ORJSON:
+            return _json.loads(mm[:])
+        with memoryview(mm) as view:
+            return _json.loads(view)
+    
+    @staticmethod
+    def _iter_lines(content: Union[bytes, mmap.mmap]):
+        """逐行遍历内容（去除首尾空白，跳过空行），不一次性切分整个字符串"""
+        start = 0
+        length = len(content)
+        while start < length:
+            end = content.find(b'\n', start)
+            if end == -1:
+                end = length
+            line = content[start:end].strip()
+            if line:
+                yield line
+            start = end + 1
+    
+    def _looks_like_jsonl(self, content: Union[bytes, mmap.mmap]) -> bool:
+        """判断内容是否为JSONL格式：第一个非空行本身就是一个完整的JSON对象"""
+        for line in self._iter_lines(content):
+            if line.startswith(b'['):
+                return False
+            try:
+                return isinstance(_json.loads(line), dict)
+            except ValueError:
+                return False
+        return False
+    
+    def _parse_json_lines(self, content: Union[bytes, mmap.mmap]) -> List[Dict]:
+        """按行解析JSONL内容，跳过无法解析的行"""
+        data = []
+        for line in self._iter_lines(content):
+            try:
+                data.append(_json.loads(line))
+            except ValueError:
+                continue
+        return data
+    
     def get_file_preview(self, file_path: str, max_rows: int = 100) -> Optional[List[Dict]]:
         """
         获取文件预览（前几行数据）
@@ -281,32 +570,76 @@ class FileManager:
         Returns:
             预览数据列表，每行是一个字典
         """
-        if file_path not in self.loaded_files:
-            return None
+        # 预览结果来自缓存的 Arrow 表，直接转换为字典列表
+        table = self.get_preview_table(file_path, max_rows)
+        return table.to_pylist(maps_as_pydicts='lossy') if table is not None else None
+    
+    def get_preview_table(self, file_path: str, max_rows: int = 100) -> Optional[pa.Table]:
+        """
+        获取文件预览的 Arrow 表，结果按 (文件路径, 行数) 缓存，重复选中同一文件时不再查询数据库
         
-        table_name = self.loaded_files[file_path]
+        Args:
+            file_path: 文件路径
+            max_rows: 最大预览行数
+            
+        Returns:
+            预览数据 Arrow 表，如果文件未加载或查询失败返回 None
+        """
+        key = (file_path, self._preview_limit(max_rows))
+        with self._lock:
+            table = self._preview_cache.get(key)
+            if table is not None:
+                self._preview_cache.move_to_end(key)
+                return table
         
+        reader = self.get_file_preview_arrow(file_path, max_rows)
+        if reader is None:
+            return None
         try:
-            # 查询前几行
-            query_result = self.conn.execute(
-                f"SELECT * FROM {table_name} LIMIT {max_rows}"
-            )
-            result = query_result.fetchall()
-            
-            # 获取列名 - description 返回 (name, type, ...) 元组列表
-            columns = [desc[0] for desc in query_result.description]
-            
-            # 转换为字典列表
-            preview_data = []
-            for row in result:
-                preview_data.append(dict(zip(columns, row)))
-            
-            return preview_data
+            table = reader.read_all()
+        except Exception as e:
+            print(f"获取预览失败: {e}")
+            return None
+        
+        with self._lock:
+            self._preview_cache[key] = table
+            if len(self._preview_cache) > PREVIEW_CACHE_SIZE:
+                self._preview_cache.popitem(last=False)
+        return table
+    
+    def get_file_preview_arrow(self, file_path: str, max_rows: int = 100,
+                               rows_per_batch: int = 1024) -> Optional[pa.RecordBatchReader]:
+        """
+        以 Arrow RecordBatchReader 形式获取文件预览，调用方可按批列式读取，无需生成 Python 行对象
+        查询在独立游标上执行，读取过程中主连接仍可执行其他查询
+        
+        Args:
+            file_path: 文件路径
+            max_rows: 最大预览行数
+            rows_per_batch: 每批行数
             
+        Returns:
+            RecordBatchReader，如果文件未加载或查询失败返回 None
+        """
+        table_name = self.loaded_files.get(file_path)
+        if table_name is None:
+            return None
+        
+        cursor = self.conn.cursor()
+        try:
+            # 以关系方式读取，可以从列类型中识别 BIT 列（旧版本 DuckDB 游标的 description 不区分 BIT 和 BLOB）
+            relation = cursor.sql(f"SELECT * FROM {table_name}").limit(self._preview_limit(max_rows))
+            return fetch_record_batch_reader(relation, rows_per_batch)
         except Exception as e:
+            cursor.close()
             print(f"获取预览失败: {e}")
             return None
     
+    @staticmethod
+    def _preview_limit(max_rows: int) -> int:
+        """将预览行数规范为非负整数，用于 LIMIT 参数绑定"""
+        return max(int(max_rows), 0)
+    
     def get_table_info(self, table_name: str) -> Optional[Dict]:
         """
         获取表信息（列名、行数等）
@@ -317,14 +650,21 @@ class FileManager:
         Returns:
             表信息字典
         """
+        # 表名只能插值到 SQL 中，先确认它是已存在的表，避免拼接任意字符串
+        with self._lock:
+            if not self._table_exists(table_name):
+                self._name_cache = None
+                if not self._table_exists(table_name):
+                    return None
+        
         try:
             # 获取列信息
-            columns_info = self.conn.execute(
+            columns_info = self._cursor().execute(
                 f"DESCRIBE {table_name}"
             ).fetchall()
             
             # 获取行数
-            row_count = self.conn.execute(
+            row_count = self._cursor().execute(
                 f"SELECT COUNT(*) FROM {table_name}"
             ).fetchone()[0]
             
@@ -336,6 +676,46 @@ class FileManager:
             print(f"获取表信息失败: {e}")
             return None
     
+    def get_row_count(self, file_path: str) -> Optional[int]:
+        """
+        获取已加载文件的行数（首次统计后缓存）
+        
+        Args:
+            file_path: 文件路径
+            
+        Returns:
+            行数，如果文件未加载或统计失败返回 None
+        """
+        with self._lock:
+            if file_path in self.row_counts:
+                return self.row_counts[file_path]
+            table_name = self.loaded_files.get(file_path)
+        if table_name is None:
+            return None
+        
+        try:
+            row_count = self._cursor().execute(f"SELECT COUNT(*) FROM {table_name}").fetchone()[0]
+        except Exception as e:
+            print(f"统计行数失败: {e}")
+            return None
+        with self._lock:
+            # 统计期间文件被卸载或重新加载时不缓存旧表的行数
+            if self.loaded_files.get(file_path) == table_name:
+                self.row_counts[file_path] = row_count
+        return row_count
+    
+    def _forget_cached(self, file_path: str):
+        """丢弃某个文件的行数和预览缓存（文件重新加载或卸载时调用，调用方持有锁）"""
+        self.row_counts.pop(file_path, None)
+        for key in [key for key in self._preview_cache if key[0] == file_path]:
+            del self._preview_cache[key]
+    
+    def clear_caches(self):
+        """清空所有行数和预览缓存（表内容可能被 SQL 语句修改时调用）"""
+        with self._lock:
+            self.row_counts.clear()
+            self._preview_cache.clear()
+    
     def unload_file(self, file_path: str) -> bool:
         """
         卸载文件（删除表）
@@ -346,21 +726,25 @@ class FileManager:
         Returns:
             是否成功
         """
-        if file_path not in self.loaded_files:
-            return False
-        
-        table_name = self.loaded_files[file_path]
-        try:
-            self.conn.execute(f"DROP TABLE IF EXISTS {table_name}")
+        with self._lock:
+            table_name = self.loaded_files.get(file_path)
+            if table_name is None:
+                return False
+            try:
+                self._cursor().execute(f"DROP TABLE IF EXISTS {table_name}")
+            except Exception as e:
+                print(f"卸载文件失败: {e}")
+                return False
             del self.loaded_files[file_path]
+            self._forget_cached(file_path)
+            if self._name_cache is not None:
+                self._name_cache.discard(table_name.lower())
             return True
-        except Exception as e:
-            print(f"卸载文件失败: {e}")
-            return False
     
     def get_loaded_files(self) -> List[str]:
         """获取已加载的文件列表"""
-        return list(self.loaded_files.keys())
+        with self._lock:
+            return list(self.loaded_files.keys())
     
     def get_file_alias(self, file_path: str) -> str:
         """获取文件别名"""
@@ -381,33 +765,50 @@ class FileManager:
             有效的表名
         """
         # 移除特殊字符，只保留字母、数字和下划线
-        import re
-        table_name = re.sub(r'[^a-zA-Z0-9_]', '_', base_name)
+        table_name = _IDENT_RE.sub('_', base_name)
         
         # 确保以字母或下划线开头
-        if table_name and not table_name[0].isalpha() and table_name[0] != '_':
+        if table_name and table_name[0] not in _IDENT_START_CHARS:
             table_name = '_' + table_name
         
         # 如果为空，使用默认名称
         if not table_name:
             table_name = 'table'
         
-        # 确保表名唯一
-        original_name = table_name
-        counter = 1
-        while self._table_exists(table_name):
-            table_name = f"{original_name}_{counter}"
-            counter += 1
+        # 确保表名唯一（每次生成时刷新一次表名缓存，之后的冲突检查都在内存中完成，
+        # 这样也能感知用户通过 SQL 自行创建的表）
+        with self._lock:
+            self._name_cache = None
+            original_name = table_name
+            counter = 1
+            while self._table_exists(table_name):
+                table_name = f"{original_name}_{counter}"
+                counter += 1
         
         return table_name
     
+    def _reserve_table_name(self, base_name: str) -> str:
+        """生成唯一的表名并在加载完成前保留（加载结束后调用 _release_table_name）"""
+        with self._lock:
+            table_name = self.generate_table_name(base_name)
+            self._loading_names.add(table_name.lower())
+        return table_name
+    
+    def _release_table_name(self, table_name: str):
+        """取消表名保留（加载成功时表名已记录在表名缓存中）"""
+        with self._lock:
+            self._loading_names.discard(table_name.lower())
+    
     def _table_exists(self, table_name: str) -> bool:
-        """检查表是否存在"""
-        try:
-            self.conn.execute(
-                f"SELECT 1 FROM {table_name} LIMIT 1"
-            )
-            return True
-        except:
-            return False
+        """检查表是否存在或正在加载中（DuckDB 表名不区分大小写，调用方持有锁）"""
+        if self._name_cache is None:
+            rows = self._cursor().execute("SELECT table_name FROM information_schema.tables").fetchall()
+            self._name_cache = {row[0].lower() for row in rows}
+        name = table_name.lower()
+        return name in self._name_cache or name in self._loading_names
+    
+    def _remember_table_name(self, table_name: str):
+        """将新创建的表名加入缓存（调用方持有锁）"""
+        if self._name_cache is not None:
+            self._name_cache.add(table_name.lower())
 
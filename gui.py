@@ -5,19 +5,225 @@ GUI 界面模块
 
 import customtkinter as ctk
 from tkinter import filedialog, messagebox, ttk
+import io
 import json
 import csv
+import os
+from datetime import timedelta
+from decimal import Decimal
 from pathlib import Path
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Tuple, Iterator, Iterable
 import threading
+from functools import partial
+
+import pyarrow as pa
+import pyarrow.compute as pc
 
 from file_manager import FileManager
 from db_manager import DatabaseManager
+from io_uring_writer import ChunkWriter
+
+# 优先使用 orjson（序列化更快），未安装时回退到标准库
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+# 预览表格的行高，以及表头大致高度（实测到表格的实际尺寸之前用于计算可见行数）
+PREVIEW_ROW_HEIGHT = 38
+PREVIEW_HEADING_HEIGHT = 40
+# 预览表格最多预先创建的行数（虚拟滚动时复用这些行）
+PREVIEW_POOL_SIZE = 50
+# 批量操作预览表格的 Tcl 匿名函数：一次调用创建 n 行 / 更新多行内容，减少 Python 与 Tcl 之间的往返
+_TCL_INSERT_ROWS = "{tree n} {set ids {}; for {set i 0} {$i < $n} {incr i} {lappend ids [$tree insert {} end]}; return $ids}"
+_TCL_FILL_ROWS = "{tree ids rows} {foreach id $ids row $rows {$tree item $id -values $row}}"
+# 一次调用配置所有列的表头和列宽（所有列使用相同的宽度和对齐方式）
+_TCL_SETUP_COLUMNS = (
+    "{tree cols} {foreach c $cols {$tree heading $c -text $c; "
+    "$tree column $c -width 150 -anchor w -stretch 0 -minwidth 100}}"
+)
+# 连续切换文件时，预览在最后一次选择后延迟多少毫秒才渲染
+PREVIEW_DEBOUNCE_MS = 120
+# 预览表格每个单元格最多显示的字符数
+PREVIEW_CELL_MAX_CHARS = 100
+# 连续点击运行查询时，在最后一次点击后延迟多少毫秒才执行
+QUERY_DEBOUNCE_MS = 150
+# 查询结果每页行数
+QUERY_PAGE_SIZE = 200
+# 导出时每批从数据库读取的行数
+EXPORT_BATCH_ROWS = 8192
+# 导出查询结果或整个文件超过该行数时先弹出确认（导出会重新执行查询或写出整张表）
+EXPORT_CONFIRM_ROWS = 100_000
+# 导出文件的写缓冲区大小（1 MiB，减少写系统调用次数）
+EXPORT_BUFFER_SIZE = 1 << 20
+# logo 源文件，以及解码后 PNG 缓存所在的用户缓存目录
+LOGO_PATH = Path(__file__).parent / "file" / "logo.tiff"
+LOGO_CACHE_DIR = Path.home() / ".cache" / "fviewer"
+
+
+def _column_display_types(table: pa.Table) -> Dict[str, str]:
+    """
+    按列类型判断每列的显示方式
+    
+    Returns:
+        列名 -> 显示类型：'str'（字符串）、'int'（整数/布尔）、'int_like'（值全为整数的浮点列，如 123.0）、
+        'float'（其他浮点列）、'other'
+    """
+    col_types = {}
+    for name, column in zip(table.column_names, table.columns):
+        column_type = column.type
+        if pa.types.is_string(column_type) or pa.types.is_large_string(column_type):
+            col_types[name] = 'str'
+        elif pa.types.is_integer(column_type) or pa.types.is_boolean(column_type):
+            col_types[name] = 'int'
+        elif pa.types.is_floating(column_type):
+            # 空值不参与判断；NaN、无穷大不是整数
+            all_integer = pc.all(pc.equal(pc.floor(column), column)).as_py() is not False \
+                and pc.all(pc.is_finite(column)).as_py() is not False
+            col_types[name] = 'int_like' if all_integer else 'float'
+        else:
+            col_types[name] = 'other'
+    return col_types
+
+
+def _has_interval(data_type: pa.DataType) -> bool:
+    """判断类型本身或其嵌套的子类型（列表元素、结构体字段等）中是否包含 INTERVAL"""
+    if pa.types.is_interval(data_type):
+        return True
+    return any(_has_interval(data_type.field(i).type) for i in range(data_type.num_fields))
+
+
+def _intervals_to_timedelta(value: Any) -> Any:
+    """
+    将 Arrow 的 month_day_nano 区间值（包括嵌套在列表、结构体中的）转换为 timedelta，
+    与 DuckDB 直接取出 INTERVAL 时的结果相同（每月按 30 天计），显示为 "3 days, 0:00:00"
+    """
+    if isinstance(value, pa.MonthDayNano):
+        return timedelta(days=value.months * 30 + value.days, microseconds=value.nanoseconds // 1000)
+    if isinstance(value, list):
+        return [_intervals_to_timedelta(v) for v in value]
+    if isinstance(value, tuple):
+        return tuple(_intervals_to_timedelta(v) for v in value)
+    if isinstance(value, dict):
+        return {k: _intervals_to_timedelta(v) for k, v in value.items()}
+    return value
+
+
+def _column_values(column: pa.ChunkedArray) -> List[Any]:
+    """
+    将一列转换为 Python 值列表：MAP 值转换为字典（与 DuckDB 直接取出时相同，显示为 {1: 'a'}
+    而不是键值对列表），INTERVAL 值转换为 timedelta
+    """
+    values = column.to_pylist(maps_as_pydicts='lossy')
+    if _has_interval(column.type):
+        values = [_intervals_to_timedelta(v) for v in values]
+    return values
+
+
+def _format_preview_rows(table: pa.Table, col_types: Dict[str, str]) -> List[tuple]:
+    """
+    按列将 Arrow 表格式化为显示用的字符串行
+    每列根据预先计算的显示类型选择格式化方式：字符串列不再转换，整数列直接转字符串，整数值浮点列
+    转为整数显示，其他浮点列由 Arrow 计算内核按列判断哪些值是整数；只有超长的值才截断为前
+    PREVIEW_CELL_MAX_CHARS 个字符
+    """
+    limit = PREVIEW_CELL_MAX_CHARS
+    columns = []
+    for name, column in zip(table.column_names, table.columns):
+        col_type = col_types[name]
+        values = _column_values(column) if col_type == 'other' else column.to_pylist()
+        if col_type == 'str':
+            texts = ["None" if v is None else v for v in values]
+        elif col_type == 'int':
+            # 整数、布尔列的文本不会超长，无需截断检查
+            columns.append([str(v) for v in values])
+            continue
+        elif col_type == 'int_like':
+            texts = ["None" if v is None else str(int(v)) for v in values]
+        elif col_type == 'float':
+            is_integer = pc.fill_null(pc.and_(pc.is_finite(column), pc.equal(pc.floor(column), column)), False)
+            texts = [str(int(v)) if m else str(v) for v, m in zip(values, is_integer.to_pylist())]
+        else:
+            texts = [str(v) for v in values]
+        columns.append([t if len(t) <= limit else t[:limit] for t in texts])
+    return list(zip(*columns))
+
+
+def _csv_value(value: Any) -> Any:
+    """将布尔值写成 true/false，与 DuckDB COPY 导出的 CSV 保持一致（日期时间的 str() 格式本身相同）"""
+    if value is True:
+        return 'true'
+    if value is False:
+        return 'false'
+    return value
+
+
+def _csv_byte_chunks(headers: List[str], chunks: Iterable[List[tuple]]) -> Iterator[bytes]:
+    """将表头和每批行数据分别格式化为 UTF-8 编码的 CSV 字节块"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(headers)
+    for rows in chunks:
+        writer.writerows([_csv_value(v) for v in row] for row in rows)
+        yield buffer.getvalue().encode('utf-8')
+        buffer.seek(0)
+        buffer.truncate()
+    # 没有数据行时仍然写出表头
+    if buffer.tell():
+        yield buffer.getvalue().encode('utf-8')
+
+
+def _write_byte_chunks(path: str, chunks: Iterable[bytes]):
+    """
+    将字节块写入文件：不经过 io 的文本编码和缓冲层，字节块先在 bytearray 中攒够 EXPORT_BUFFER_SIZE 字节，
+    再交给 ChunkWriter 写出（Linux 上可用 liburing 时批量通过 io_uring 提交，否则直接 os.write）
+    """
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, 'O_BINARY', 0), 0o644)
+    try:
+        with ChunkWriter(fd) as writer:
+            pending = bytearray()
+            for chunk in chunks:
+                pending += chunk
+                if len(pending) >= EXPORT_BUFFER_SIZE:
+                    writer.write(bytes(pending))
+                    pending.clear()
+            if pending:
+                writer.write(bytes(pending))
+    finally:
+        os.close(fd)
+
+
+def _json_default(value: Any) -> Any:
+    """JSON 无法直接序列化的值：DECIMAL 写为数字，其他值（日期时间等）转为字符串，与 DuckDB COPY 导出的格式一致"""
+    if isinstance(value, Decimal):
+        return float(value)
+    return str(value)
+
+
+def _json_line(record: Dict[str, Any]) -> bytes:
+    """
+    将一条记录序列化为 UTF-8 编码的 JSON 行
+    日期时间同样按 str() 写成 "2024-01-02 03:04:05"，与标准库 json 和 DuckDB COPY 导出的格式一致
+    """
+    if orjson is not None:
+        return orjson.dumps(
+            record, default=_json_default,
+            # MAP 转换成的字典可能以数字为键，与标准库 json 一样写成字符串键
+            option=orjson.OPT_APPEND_NEWLINE | orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+        )
+    return (json.dumps(record, ensure_ascii=False, default=_json_default) + "\n").encode('utf-8')
 
 
 class FileViewerApp:
     """文件查看器主应用类"""
     
+    # 已安装表格样式的主窗口（ttk 样式在每个 Tk 解释器中只需配置一次）
+    _styled_root = None
+    # 预览表格的正文和表头字体
+    _TREE_BODY_FONT = ('SF Pro', 12)
+    _TREE_HEADING_FONT = ('SF Pro', 11, 'bold')
+    
     def __init__(self):
         """初始化应用"""
         # 设置外观模式和颜色主题
@@ -31,18 +237,32 @@ class FileViewerApp:
         # 设置最小窗口大小
         self.root.minsize(1200, 700)
         
+        # 界面字体只创建一次，所有控件共用（文件列表刷新时不再为每一项新建字体对象）
+        self._fonts: Dict[str, ctk.CTkFont] = {
+            'body13': ctk.CTkFont(size=13),
+            'bold11': ctk.CTkFont(size=11, weight="bold"),
+            'bold12': ctk.CTkFont(size=12, weight="bold"),
+            'bold13': ctk.CTkFont(size=13, weight="bold"),
+            'bold14': ctk.CTkFont(size=14, weight="bold"),
+            'bold18': ctk.CTkFont(size=18, weight="bold"),
+            'bold24': ctk.CTkFont(size=24, weight="bold"),
+            'bold28': ctk.CTkFont(size=28, weight="bold"),
+            'emoji32': ctk.CTkFont(size=32),
+            'mono13': ctk.CTkFont(family="Monaco", size=13),
+        }
+        
         # 初始化数据库和文件管理器
         self.db_manager = DatabaseManager()
         self.file_manager = FileManager(self.db_manager.get_connection())
         
-        # 设置应用图标
+        # 设置应用图标（logo 只解码一次，侧边栏复用缩小后的版本）
+        self._logo_pil = None
+        self._logo_small = None
         try:
-            logo_path = Path(__file__).parent / "file/logo.tiff"
-            if logo_path.exists():
-                # 使用 PIL/Pillow 加载图片（支持多种格式，包括 JPEG 和 PNG）
-                from PIL import Image, ImageTk
-                img = Image.open(str(logo_path))
-                icon = ImageTk.PhotoImage(img)
+            self._logo_pil, self._logo_small = self._load_logo_images()
+            if self._logo_pil is not None:
+                from PIL import ImageTk
+                icon = ImageTk.PhotoImage(self._logo_pil)
                 self.root.iconphoto(True, icon)
                 # 保存引用，防止被垃圾回收
                 self.root._icon = icon
@@ -52,8 +272,38 @@ class FileViewerApp:
         # 当前选中的文件
         self.current_file: Optional[str] = None
         
-        # 当前显示的数据（用于导出）- 保存完整数据，不仅仅是显示的10行
-        self.current_display_data: Optional[List[Dict[str, Any]]] = None
+        # 当前显示的数据（Arrow 表）：查询结果为当前页，文件为预览行；导出时重新读取完整结果或整张表
+        self.current_display_data: Optional[pa.Table] = None
+        # 当前显示数据每列的显示类型（预览格式化使用）
+        self._col_types: Dict[str, str] = {}
+        # 当前显示的文件预览对应的表名（导出时整表 COPY）；显示查询或语句结果时为 None
+        self._preview_table: Optional[str] = None
+        
+        # 后台加载：FileManager 的查询在各线程自己的游标上执行，共享状态由其内部的锁保护，
+        # 加载线程与主线程的预览、卸载等操作可以同时进行；正在进行的加载数量（仅主线程访问）
+        self._active_loads = 0
+        
+        # 等待执行的预览渲染（连续选择文件时只渲染最后一次）
+        self._preview_after_id: Optional[str] = None
+        
+        # 预览表格虚拟滚动状态：预先格式化的行、复用的表格行、当前窗口起始行
+        self._preview_rows: List[tuple] = []
+        self._preview_pool: List[str] = []
+        self._preview_offset = 0
+        # 实测的 (表头高度, 行高)，首次显示出行后测量并缓存（字体或 DPI 缩放会改变实际高度）
+        self._preview_metrics: Optional[Tuple[int, int]] = None
+        
+        # 查询结果分页状态：原始查询语句（同时作为导出时重新读取的依据）、总行数、当前页起始行
+        self._query_page_size = QUERY_PAGE_SIZE
+        self._query_sql: Optional[str] = None
+        self._query_total = 0
+        self._query_offset = 0
+        # SQL 输入框文本缓存，以及输入框内容是否在缓存之后被修改
+        self._sql_cache: Optional[str] = None
+        self._sql_dirty = True
+        # 查询在后台线程中执行：是否有查询正在执行、等待执行的查询（连续触发时只执行最后一次）
+        self._query_inflight = False
+        self._query_after_id: Optional[str] = None
         
         # 创建界面
         self._create_widgets()
@@ -61,12 +311,101 @@ class FileViewerApp:
         # 绑定窗口关闭事件
         self.root.protocol("WM_DELETE_WINDOW", self._on_closing)
     
+    @classmethod
+    def _setup_treeview_style(cls, master):
+        """
+        配置预览表格的 ttk 样式 - 优雅的现代风格
+        
+        样式属于 Tk 解释器，同一窗口只需配置一次；重复创建界面时直接跳过。
+        
+        Args:
+            master: 主窗口
+        """
+        if cls._styled_root is master:
+            return
+        
+        style = ttk.Style(master)
+        style.theme_use("clam")
+        
+        # 表格主体样式
+        style.configure("Treeview", 
+                      background="#FFFFFF",
+                      foreground="#374151",
+                      fieldbackground="#FFFFFF",
+                      borderwidth=1,
+                      relief="solid",
+                      rowheight=PREVIEW_ROW_HEIGHT,
+                      font=cls._TREE_BODY_FONT)
+        
+        # 表头样式 - 更突出
+        style.configure("Treeview.Heading",
+                       background="#F3F4F6",
+                       foreground="#1F2937",
+                       borderwidth=1,
+                       relief="solid",
+                       font=cls._TREE_HEADING_FONT,
+                       padding=10)
+        
+        style.map("Treeview.Heading",
+                 background=[('active', '#E5E7EB')])
+        
+        # 选中行样式 - 优雅的蓝色
+        style.map("Treeview",
+                 background=[("selected", "#4CAF50")],
+                 foreground=[("selected", "white")])
+        
+        cls._styled_root = master
+    
+    def _load_logo_images(self):
+        """
+        加载 logo 原图和 32x32 缩略图
+        
+        首次启动时解码 TIFF 并缩放，结果以 PNG 缓存到用户缓存目录；之后启动直接读取 PNG 缓存，
+        源文件更新后缓存自动失效。
+        
+        Returns:
+            (原图, 32x32 缩略图)，logo 文件不存在时返回 (None, None)
+        """
+        if not LOGO_PATH.exists():
+            return None, None
+        
+        from PIL import Image
+        
+        full_cache = LOGO_CACHE_DIR / "logo.png"
+        small_cache = LOGO_CACHE_DIR / "logo_32.png"
+        source_mtime = LOGO_PATH.stat().st_mtime
+        try:
+            if full_cache.stat().st_mtime >= source_mtime and small_cache.stat().st_mtime >= source_mtime:
+                # 用 with 打开，解码完成后立即关闭文件
+                with Image.open(full_cache) as full_image, Image.open(small_cache) as small_image:
+                    return full_image.convert("RGBA"), small_image.convert("RGBA")
+        except OSError:
+            pass  # 缓存不存在或已损坏，重新生成
+        
+        with Image.open(LOGO_PATH) as source_image:
+            full = source_image.convert("RGBA")
+        small = full.copy()
+        small.thumbnail((32, 32), Image.Resampling.LANCZOS)
+        try:
+            LOGO_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+            full.save(full_cache, format="PNG")
+            small.save(small_cache, format="PNG")
+        except OSError as e:
+            # 缓存写入失败不影响本次显示
+            print(f"Warning: Could not cache logo: {e}")
+        return full, small
+    
     def _create_widgets(self):
         """创建界面组件"""
         # 主容器 - 现代化背景渐变效果
         main_container = ctk.CTkFrame(self.root, fg_color="#F8F9FA")
         main_container.pack(fill="both", expand=True)
         
+        # 使用 Grid 布局：左侧栏固定宽度，右侧内容区域占满剩余空间
+        main_container.grid_rowconfigure(0, weight=1)
+        main_container.grid_columnconfigure(0, minsize=280, weight=0)
+        main_container.grid_columnconfigure(1, weight=1)
+        
         # 左侧：优雅的侧边栏 (参考图片风格)
         left_panel = ctk.CTkFrame(
             main_container, 
@@ -74,25 +413,25 @@ class FileViewerApp:
             fg_color="#4CAF50",  # 优雅的绿色主题
             corner_radius=0
         )
-        left_panel.pack(side="left", fill="both", padx=0, pady=0)
-        left_panel.pack_propagate(False)
+        left_panel.grid(row=0, column=0, sticky="ns")
+        # 固定侧边栏宽度，不随较长的文件名变宽
+        left_panel.grid_propagate(False)
+        # 侧边栏内部同样使用 Grid 布局，文件列表占满剩余高度
+        left_panel.grid_columnconfigure(0, weight=1)
+        left_panel.grid_rowconfigure(4, weight=1)
         
         # Logo 和标题区域
         header_frame = ctk.CTkFrame(left_panel, fg_color="transparent")
-        header_frame.pack(fill="x", padx=20, pady=(30, 20))
+        header_frame.grid(row=0, column=0, sticky="ew", padx=20, pady=(30, 20))
         
         # 应用图标和名称
         app_title_frame = ctk.CTkFrame(header_frame, fg_color="transparent")
         app_title_frame.pack(fill="x")
         
-        # 加载并显示 logo 图标
+        # 显示 logo 图标（使用初始化时缓存的 32x32 版本）
         try:
-            from PIL import Image
-            logo_path = Path(__file__).parent / "file/logo.tiff"
-            if logo_path.exists():
-                logo_image = Image.open(str(logo_path))
-                # 调整图片大小为 32x32
-                logo_image = logo_image.resize((32, 32), Image.Resampling.LANCZOS)
+            if self._logo_small is not None:
+                logo_image = self._logo_small
                 logo_ctk = ctk.CTkImage(light_image=logo_image, dark_image=logo_image, size=(32, 32))
                 
                 ctk.CTkLabel(
@@ -105,7 +444,7 @@ class FileViewerApp:
                 ctk.CTkLabel(
                     app_title_frame,
                     text="📊",
-                    font=ctk.CTkFont(size=32),
+                    font=self._fonts['emoji32'],
                 ).pack(side="left", padx=(0, 10))
         except Exception as e:
             print(f"无法加载 logo: {e}")
@@ -113,31 +452,31 @@ class FileViewerApp:
             ctk.CTkLabel(
                 app_title_frame,
                 text="📊",
-                font=ctk.CTkFont(size=32),
+                font=self._fonts['emoji32'],
             ).pack(side="left", padx=(0, 10))
         
         ctk.CTkLabel(
             app_title_frame,
             text="FViewer",
-            font=ctk.CTkFont(size=24, weight="bold"),
+            font=self._fonts['bold24'],
             text_color="white"
         ).pack(side="left")
         
         # 文件列表标题
         file_header = ctk.CTkFrame(left_panel, fg_color="transparent")
-        file_header.pack(fill="x", padx=20, pady=(20, 15))
+        file_header.grid(row=1, column=0, sticky="ew", padx=20, pady=(20, 15))
         
         ctk.CTkLabel(
             file_header, 
             text="LIBRARY", 
-            font=ctk.CTkFont(size=11, weight="bold"), 
+            font=self._fonts['bold11'], 
             text_color="#E8E8E8",  # 半透明白色的实际效果
             anchor="w"
         ).pack(fill="x")
         
         # 添加文件按钮容器
         button_frame = ctk.CTkFrame(left_panel, fg_color="transparent")
-        button_frame.pack(fill="x", padx=15, pady=(0, 15))
+        button_frame.grid(row=2, column=0, sticky="ew", padx=15, pady=(0, 15))
         
         # 添加文件按钮 - 现代风格
         ctk.CTkButton(
@@ -146,7 +485,7 @@ class FileViewerApp:
             width=120,
             height=36,
             command=self._load_file,
-            font=ctk.CTkFont(size=13, weight="bold"),
+            font=self._fonts['bold13'],
             fg_color="#66BB6B",  # 半透明白色在绿色背景上的效果
             text_color="white",
             hover_color="#80C784",  # 更亮的半透明效果
@@ -160,26 +499,37 @@ class FileViewerApp:
             width=120, 
             height=36,
             command=self._load_directory,
-            font=ctk.CTkFont(size=13, weight="bold"),
+            font=self._fonts['bold13'],
             fg_color="#66BB6B",  # 半透明白色在绿色背景上的效果
             text_color="white",
             hover_color="#80C784",  # 更亮的半透明效果
             corner_radius=8
         ).pack(side="left", expand=True, fill="x")
         
+        # 加载进度条（有文件正在后台加载时显示在文件列表上方）
+        self.load_progress = ctk.CTkProgressBar(
+            left_panel,
+            mode="indeterminate",
+            height=6,
+            progress_color="white",
+            fg_color="#66BB6B"
+        )
+        self.load_progress.grid(row=3, column=0, sticky="ew", padx=20, pady=(0, 10))
+        self.load_progress.grid_remove()
+        
         # 文件列表容器
         self.file_listbox_frame = ctk.CTkScrollableFrame(
             left_panel, 
             fg_color="transparent",
             scrollbar_button_color="#80C784"  # 半透明白色在绿色背景上
         )
-        self.file_listbox_frame.pack(fill="both", expand=True, padx=10, pady=0)
+        self.file_listbox_frame.grid(row=4, column=0, sticky="nsew", padx=10, pady=0)
         
-        self.file_buttons: List[Dict] = []
+        self.file_buttons: Dict[str, Dict[str, Any]] = {}  # 文件路径 -> 列表项控件
         
         # 右侧：主内容区域
         right_container = ctk.CTkFrame(main_container, fg_color="transparent")
-        right_container.pack(side="right", fill="both", expand=True, padx=25, pady=25)
+        right_container.grid(row=0, column=1, sticky="nsew", padx=25, pady=25)
         
         # 使用 Grid 布局管理右侧区域，确保布局稳定
         right_container.grid_rowconfigure(1, weight=1)
@@ -193,7 +543,7 @@ class FileViewerApp:
         ctk.CTkLabel(
             top_bar,
             text="Data Preview",
-            font=ctk.CTkFont(size=28, weight="bold"),
+            font=self._fonts['bold28'],
             text_color="#1F2937",
             anchor="w"
         ).pack(side="left", fill="y")
@@ -220,7 +570,7 @@ class FileViewerApp:
         self.preview_stats_label = ctk.CTkLabel(
             preview_header,
             text="",
-            font=ctk.CTkFont(size=13),
+            font=self._fonts['body13'],
             text_color="#6B7280",
             anchor="w"
         )
@@ -241,54 +591,30 @@ class FileViewerApp:
         tree_frame.pack(fill="both", expand=True, padx=2, pady=2)
         
         # 滚动条 - 现代风格
-        scrollbar_y = ctk.CTkScrollbar(tree_frame, orientation="vertical")
-        scrollbar_y.pack(side="right", fill="y")
+        self.preview_scrollbar_y = ctk.CTkScrollbar(tree_frame, orientation="vertical")
+        self.preview_scrollbar_y.pack(side="right", fill="y")
         
         scrollbar_x = ctk.CTkScrollbar(tree_frame, orientation="horizontal")
         scrollbar_x.pack(side="bottom", fill="x")
         
-        # Treeview表格
+        # Treeview表格（纵向为虚拟滚动：只保留可见行数的表格行，滚动时替换行内容）
         self.preview_tree = ttk.Treeview(
             tree_frame,
-            yscrollcommand=scrollbar_y.set,
             xscrollcommand=scrollbar_x.set,
             show="headings"
         )
         self.preview_tree.pack(side="left", fill="both", expand=True)
         
-        scrollbar_y.configure(command=self.preview_tree.yview)
+        self.preview_scrollbar_y.configure(command=self._on_preview_yview)
         scrollbar_x.configure(command=self.preview_tree.xview)
         
-        # 配置表格样式 - 优雅的现代风格
-        style = ttk.Style()
-        style.theme_use("clam")
+        self.preview_tree.bind("<Configure>", lambda e: self._render_preview_window(self._preview_offset))
+        self.preview_tree.bind("<MouseWheel>", self._on_preview_mousewheel)
+        self.preview_tree.bind("<Button-4>", lambda e: self._scroll_preview(-1))
+        self.preview_tree.bind("<Button-5>", lambda e: self._scroll_preview(1))
         
-        # 表格主体样式
-        style.configure("Treeview", 
-                      background="#FFFFFF",
-                      foreground="#374151",
-                      fieldbackground="#FFFFFF",
-                      borderwidth=1,
-                      relief="solid",
-                      rowheight=38,
-                      font=('SF Pro', 12))
-        
-        # 表头样式 - 更突出
-        style.configure("Treeview.Heading",
-                       background="#F3F4F6",
-                       foreground="#1F2937",
-                       borderwidth=1,
-                       relief="solid",
-                       font=('SF Pro', 11, 'bold'),
-                       padding=10)
-        
-        style.map("Treeview.Heading",
-                 background=[('active', '#E5E7EB')])
-        
-        # 选中行样式 - 优雅的蓝色
-        style.map("Treeview",
-                 background=[("selected", "#4CAF50")],
-                 foreground=[("selected", "white")])
+        # 配置表格样式（同一 Tk 解释器只安装一次）
+        self._setup_treeview_style(self.root)
         
         self.preview_tree.configure(style="Treeview")
         
@@ -312,7 +638,7 @@ class FileViewerApp:
         ctk.CTkLabel(
             sql_header, 
             text="⚡ SQL Query", 
-            font=ctk.CTkFont(size=18, weight="bold"),
+            font=self._fonts['bold18'],
             text_color="#1F2937"
         ).pack(side="left")
         
@@ -320,7 +646,7 @@ class FileViewerApp:
         self.sql_text = ctk.CTkTextbox(
             sql_content, 
             height=90,
-            font=ctk.CTkFont(family="Monaco", size=13),
+            font=self._fonts['mono13'],
             fg_color="#F9FAFB",
             border_color="#E5E7EB",
             border_width=1,
@@ -328,6 +654,8 @@ class FileViewerApp:
             text_color="#1F2937"
         )
         self.sql_text.pack(fill="x", pady=(0, 15))
+        # 输入框内容变化时标记缓存失效，执行查询时只在内容改变后才重新读取文本
+        self.sql_text.bind("<<Modified>>", self._on_sql_modified)
         
         # 按钮容器
         button_frame = ctk.CTkFrame(sql_content, fg_color="transparent")
@@ -338,7 +666,7 @@ class FileViewerApp:
             button_frame, 
             text="▶ Run Query", 
             command=self._execute_query,
-            font=ctk.CTkFont(size=14, weight="bold"),
+            font=self._fonts['bold14'],
             height=40,
             fg_color="#4CAF50", 
             hover_color="#45A049",
@@ -346,12 +674,47 @@ class FileViewerApp:
             text_color="white"
         ).pack(side="left", padx=(0, 12))
         
+        # 查询结果翻页按钮
+        self.prev_page_btn = ctk.CTkButton(
+            button_frame,
+            text="◀ Prev",
+            width=70,
+            command=self._query_prev_page,
+            font=self._fonts['body13'],
+            height=40,
+            fg_color="#F9FAFB",
+            text_color="#374151",
+            hover_color="#E5E7EB",
+            border_width=1,
+            border_color="#D1D5DB",
+            corner_radius=10,
+            state="disabled"
+        )
+        self.prev_page_btn.pack(side="left", padx=(0, 6))
+        
+        self.next_page_btn = ctk.CTkButton(
+            button_frame,
+            text="Next ▶",
+            width=70,
+            command=self._query_next_page,
+            font=self._fonts['body13'],
+            height=40,
+            fg_color="#F9FAFB",
+            text_color="#374151",
+            hover_color="#E5E7EB",
+            border_width=1,
+            border_color="#D1D5DB",
+            corner_radius=10,
+            state="disabled"
+        )
+        self.next_page_btn.pack(side="left", padx=(0, 12))
+        
         # 导出 JSON 按钮
         ctk.CTkButton(
             button_frame, 
             text="📄 Export JSON", 
-            command=lambda: self._export_result("json"),
-            font=ctk.CTkFont(size=13),
+            command=partial(self._export_result, "json"),
+            font=self._fonts['body13'],
             height=40,
             fg_color="#F9FAFB",
             text_color="#374151",
@@ -365,8 +728,8 @@ class FileViewerApp:
         ctk.CTkButton(
             button_frame, 
             text="📊 Export CSV", 
-            command=lambda: self._export_result("csv"),
-            font=ctk.CTkFont(size=13),
+            command=partial(self._export_result, "csv"),
+            font=self._fonts['body13'],
             height=40,
             fg_color="#F9FAFB",
             text_color="#374151",
@@ -393,7 +756,13 @@ class FileViewerApp:
             # 弹出对话框让用户输入别名
             alias = self._get_file_alias(file_path)
             if alias:
-                self._process_file_load(file_path, alias)
+                # 在新线程中加载，避免大文件加载时界面冻结
+                self._begin_load()
+                threading.Thread(
+                    target=self._process_file_load,
+                    args=(file_path, alias),
+                    daemon=True
+                ).start()
     
     def _load_directory(self):
         """加载文件夹"""
@@ -424,6 +793,7 @@ class FileViewerApp:
                 alias = self.file_manager.generate_table_name(alias)
             
             # 在新线程中加载，避免界面冻结
+            self._begin_load()
             threading.Thread(
                 target=self._process_directory_load,
                 args=(dir_path, alias),
@@ -454,38 +824,63 @@ class FileViewerApp:
         
         return default_table_name
     
+    def _begin_load(self):
+        """登记一个后台加载任务并显示进度条（主线程调用）"""
+        self._active_loads += 1
+        if self._active_loads == 1:
+            self.load_progress.grid()
+            self.load_progress.start()
+    
+    def _end_load(self):
+        """结束一个后台加载任务，全部完成后隐藏进度条（主线程调用）"""
+        self._active_loads -= 1
+        if self._active_loads == 0:
+            self.load_progress.stop()
+            self.load_progress.grid_remove()
+    
     def _process_file_load(self, file_path: str, alias: str):
-        """处理文件加载"""
-        table_name = self.file_manager.load_file(file_path, alias)
-        
-        if table_name:
-            self._update_file_list()
-            # messagebox.showinfo("成功", f"文件加载成功！\n别名: {alias}\n表名: {table_name}")
+        """处理文件加载（在后台线程中执行）"""
+        try:
+            table_name = self.file_manager.load_file(file_path, alias)
+            if table_name:
+                # 加载时统计一次行数，之后预览直接使用缓存
+                self.file_manager.get_row_count(file_path)
             
-            # 自动选中并预览
-            self._select_file(file_path)
-        else:
-            messagebox.showerror("错误", f"文件加载失败：{Path(file_path).name}")
+            if table_name:
+                # 在主线程中更新界面
+                self.root.after(0, self._update_file_list)
+                # messagebox.showinfo("成功", f"文件加载成功！\n别名: {alias}\n表名: {table_name}")
+                
+                # 自动选中并预览
+                self.root.after(0, partial(self._select_file, file_path))
+            else:
+                error_msg = f"文件加载失败：{Path(file_path).name}"
+                self.root.after(0, partial(messagebox.showerror, "错误", error_msg))
+        finally:
+            self.root.after(0, self._end_load)
     
     def _process_directory_load(self, dir_path: str, alias: str):
-        """处理文件夹加载"""
+        """处理文件夹加载（在后台线程中执行）"""
         try:
             table_name = self.file_manager.load_directory(dir_path, alias)
+            if table_name:
+                # 在后台线程中统计一次行数，之后预览直接使用缓存
+                self.file_manager.get_row_count(dir_path)
             
             if table_name:
                 # 在主线程中更新界面
-                self.root.after(0, lambda: self._update_file_list())
+                self.root.after(0, self._update_file_list)
                 success_msg = f"文件夹加载成功！\n别名: {alias}\n表名: {table_name}"
                 # self.root.after(0, lambda msg=success_msg: messagebox.showinfo("成功", msg))
                 # 自动选中并预览
-                self.root.after(0, lambda fp=dir_path: self._select_file(fp))
+                self.root.after(0, partial(self._select_file, dir_path))
             else:
                 error_msg = f"无法加载文件夹 '{Path(dir_path).name}'。\n\n可能的原因：\n- 文件夹中没有支持的文件格式（CSV、Parquet、JSON）\n- 文件格式损坏或无法读取\n- 文件权限不足"
-                self.root.after(0, lambda msg=error_msg: messagebox.showerror("加载失败", msg))
+                self.root.after(0, partial(messagebox.showerror, "加载失败", error_msg))
         except ValueError as e:
             # 格式或schema不一致的错误
             error_msg = f"文件夹格式验证失败：\n\n{str(e)}\n\n请确保：\n1. 文件夹中所有文件格式一致（都是 CSV、Parquet 或 JSON）\n2. 所有文件的内容结构（列/键）完全一致"
-            self.root.after(0, lambda msg=error_msg: messagebox.showerror("加载失败", msg))
+            self.root.after(0, partial(messagebox.showerror, "加载失败", error_msg))
         except Exception as e:
             # 其他错误
             error_str = str(e)
@@ -499,100 +894,134 @@ class FileViewerApp:
                 error_msg = f"文件夹 '{Path(dir_path).name}' 不存在或已被删除。"
             else:
                 error_msg = f"加载文件夹 '{Path(dir_path).name}' 时发生错误。\n\n错误信息：{error_str}\n\n请检查文件夹路径和文件格式是否正确。"
-            self.root.after(0, lambda msg=error_msg: messagebox.showerror("加载失败", msg))
+            self.root.after(0, partial(messagebox.showerror, "加载失败", error_msg))
+        finally:
+            self.root.after(0, self._end_load)
     
     def _update_file_list(self):
-        """更新文件列表显示"""
-        # 清除现有按钮
-        for item in self.file_buttons:
-            if isinstance(item, dict):
-                item['frame'].destroy()
-            else:
-                item.destroy()
-        self.file_buttons.clear()
-        
-        # 添加新文件按钮
+        """更新文件列表显示（只增删变化的列表项，已有项仅刷新选中状态）"""
         loaded_files = self.file_manager.get_loaded_files()
+        loaded_set = set(loaded_files)
         
+        # 移除已卸载的文件，以及别名发生变化（重新加载）的文件
+        for file_path in list(self.file_buttons):
+            if file_path not in loaded_set or \
+                    self.file_buttons[file_path]['alias'] != self.file_manager.get_file_alias(file_path):
+                self.file_buttons.pop(file_path)['frame'].destroy()
+        
+        # 已有按钮只更新选中状态
+        new_files = []
         for file_path in loaded_files:
-            alias = self.file_manager.get_file_alias(file_path)
-            # 获取原文件名或文件夹名
-            path_obj = Path(file_path)
-            if path_obj.is_dir():
-                original_name = path_obj.name
+            item = self.file_buttons.get(file_path)
+            if item is None:
+                new_files.append(file_path)
             else:
-                original_name = path_obj.name
-            
-            # 显示格式：别名(文件名)，处理文件名过长
-            max_name_length = 30  # 最大文件名显示长度
-            if len(original_name) > max_name_length:
-                display_name = original_name[:max_name_length-3] + "..."
-            else:
-                display_name = original_name
-            display_text = f"{alias}({display_name})"
-            
-            # 创建列表项容器 - 现代风格
-            item_frame = ctk.CTkFrame(
-                self.file_listbox_frame,
-                fg_color="transparent"
-            )
-            item_frame.pack(fill="x", pady=3, padx=5)
-            
-            # 删除按钮 - 圆形图标（放在最左侧）
-            delete_btn = ctk.CTkButton(
-                item_frame,
-                text="X",
-                width=24,
-                height=32,
-                command=lambda fp=file_path: self._delete_file(fp),
-                font=ctk.CTkFont(size=12, weight="bold"),
-                fg_color="#F44336",  # 红色
-                hover_color="#C62828",  # 深红色
-                text_color="white",
-                corner_radius=8
-            )
-            delete_btn.pack(side="left", padx=(0, 5))
-            
-            # 文件按钮 - 优雅的侧边栏风格
-            btn = ctk.CTkButton(
-                item_frame,
-                text=f"  📄 {display_text}",
-                anchor="w",
-                height=42,
-                command=lambda fp=file_path: self._select_file(fp),
-                font=ctk.CTkFont(size=13),
-                fg_color="#73C177" if file_path == self.current_file else "transparent",
-                text_color="white",
-                hover_color="#5CB560",  # 悬停时的半透明效果
-                corner_radius=8
-            )
-            btn._file_path = file_path  
-            btn._full_text = f"{alias}({original_name})"
-            btn.pack(side="left", fill="both", expand=True)
-            
-            self.file_buttons.append({'frame': item_frame, 'select_btn': btn, 'delete_btn': delete_btn})
+                item['select_btn'].configure(
+                    fg_color="#73C177" if file_path == self.current_file else "transparent"
+                )
+        
+        # 添加新文件按钮；一次添加多项时先隐藏列表容器，全部创建完再显示，只触发一次布局计算
+        batch = len(new_files) > 1
+        if batch:
+            self.file_listbox_frame.grid_remove()
+        for file_path in new_files:
+            self.file_buttons[file_path] = self._create_file_item(file_path)
+        if batch:
+            self.file_listbox_frame.grid()
+    
+    def _create_file_item(self, file_path: str) -> Dict[str, Any]:
+        """
+        创建文件列表中的一项
+        
+        Args:
+            file_path: 文件路径
             
-            # 设置选中状态样式
-            if file_path == self.current_file:
-                btn.configure(fg_color="#73C177")
-            else:
-                btn.configure(fg_color="transparent")
+        Returns:
+            包含 frame、select_btn、delete_btn、alias 的字典
+        """
+        alias = self.file_manager.get_file_alias(file_path)
+        # 获取原文件名或文件夹名
+        original_name = Path(file_path).name
+        
+        # 显示格式：别名(文件名)，处理文件名过长
+        max_name_length = 30  # 最大文件名显示长度
+        if len(original_name) > max_name_length:
+            display_name = original_name[:max_name_length-3] + "..."
+        else:
+            display_name = original_name
+        display_text = f"{alias}({display_name})"
+        
+        # 创建列表项容器 - 现代风格
+        item_frame = ctk.CTkFrame(
+            self.file_listbox_frame,
+            fg_color="transparent"
+        )
+        item_frame.pack(fill="x", pady=3, padx=5)
+        
+        # 删除按钮 - 圆形图标（放在最左侧）
+        delete_btn = ctk.CTkButton(
+            item_frame,
+            text="X",
+            width=24,
+            height=32,
+            command=partial(self._delete_file, file_path),
+            font=self._fonts['bold12'],
+            fg_color="#F44336",  # 红色
+            hover_color="#C62828",  # 深红色
+            text_color="white",
+            corner_radius=8
+        )
+        delete_btn.pack(side="left", padx=(0, 5))
+        
+        # 文件按钮 - 优雅的侧边栏风格
+        btn = ctk.CTkButton(
+            item_frame,
+            text=f"  📄 {display_text}",
+            anchor="w",
+            height=42,
+            command=partial(self._select_file, file_path),
+            font=self._fonts['body13'],
+            fg_color="#73C177" if file_path == self.current_file else "transparent",
+            text_color="white",
+            hover_color="#5CB560",  # 悬停时的半透明效果
+            corner_radius=8
+        )
+        btn._file_path = file_path  
+        btn._full_text = f"{alias}({original_name})"
+        btn.pack(side="left", fill="both", expand=True)
+        
+        return {'frame': item_frame, 'select_btn': btn, 'delete_btn': delete_btn, 'alias': alias}
     
     def _select_file(self, file_path: str):
         """选中文件并显示预览"""
+        previous_file = self.current_file
         self.current_file = file_path
         
-        # 更新按钮状态 - 现代风格
-        for item in self.file_buttons:
-            if isinstance(item, dict):
-                btn = item['select_btn']
-                if hasattr(btn, '_file_path') and btn._file_path == file_path:
-                    btn.configure(fg_color="#73C177")  # 选中状态
-                elif hasattr(btn, '_file_path'):
-                    btn.configure(fg_color="transparent")
-        
-        # 显示预览
-        self._show_preview(file_path)
+        # 更新按钮状态 - 现代风格（只需改动之前选中的和新选中的按钮）
+        previous_item = self.file_buttons.get(previous_file)
+        if previous_item is not None and previous_file != file_path:
+            previous_item['select_btn'].configure(fg_color="transparent")
+        item = self.file_buttons.get(file_path)
+        if item is not None:
+            item['select_btn'].configure(fg_color="#73C177")  # 选中状态
+        
+        # 显示预览：合并短时间内的连续选择，只渲染最后选中的文件
+        self._cancel_pending_preview()
+        self._preview_after_id = self.root.after(
+            PREVIEW_DEBOUNCE_MS, partial(self._show_pending_preview, file_path)
+        )
+    
+    def _show_pending_preview(self, file_path: str):
+        """执行延迟的预览渲染"""
+        self._preview_after_id = None
+        if self.current_file == file_path:
+            self._show_preview(file_path)
+    
+    def _cancel_pending_preview(self):
+        """取消尚未执行的预览渲染"""
+        if self._preview_after_id is not None:
+            self.root.after_cancel(self._preview_after_id)
+            self._preview_after_id = None
     
     def _delete_file(self, file_path: str):
         """删除文件"""
@@ -603,11 +1032,7 @@ class FileViewerApp:
                 if self.current_file == file_path:
                     self.current_file = None
                     # 清空预览
-                    for item in self.preview_tree.get_children():
-                        self.preview_tree.delete(item)
-                    self.preview_tree["columns"] = []
-                    self.preview_stats_label.configure(text="")
-                    self.current_display_data = None
+                    self._clear_preview()
                 
                 # 更新文件列表
                 self._update_file_list()
@@ -617,126 +1042,352 @@ class FileViewerApp:
     
     def _clear_preview(self):
         """清空预览内容"""
+        self._cancel_pending_preview()
         # 清空表格
-        for item in self.preview_tree.get_children():
-            self.preview_tree.delete(item)
+        self._reset_preview_rows()
         self.preview_tree["columns"] = []
         # 清空统计信息
         self.preview_stats_label.configure(text="")
         # 清空当前显示数据
         self.current_display_data = None
+        self._preview_table = None
+        self._query_sql = None
+        self._update_page_buttons()
     
-    def _show_preview(self, file_path: str, data: Optional[List[Dict[str, Any]]] = None, max_rows: int = 10):
+    def _show_preview(self, file_path: str, data: Optional[pa.Table] = None, max_rows: int = 10):
         """显示文件预览（表格样式）"""
         # 如果提供了数据，使用提供的数据；否则从文件管理器获取
         if data is None:
-            preview_data = self.file_manager.get_file_preview(file_path, max_rows=max_rows)
-            # 保存完整预览数据（用于导出）
+            # 显示文件预览时清除查询分页状态
+            self._query_sql = None
+            self._update_page_buttons()
+            preview_data = self.file_manager.get_preview_table(file_path, max_rows=max_rows)
+            # 保存预览数据；导出时整表写出，记录预览对应的表名
             self.current_display_data = preview_data
+            self._col_types = _column_display_types(preview_data) if preview_data is not None else {}
+            self._preview_table = self.file_manager.loaded_files.get(file_path) if preview_data is not None else None
         else:
             # 保存完整的查询结果数据（用于导出）
             self.current_display_data = data
+            self._preview_table = None
+            self._col_types = _column_display_types(data)
             # 只显示前max_rows行
-            preview_data = data[:max_rows] if data else []
+            preview_data = data.slice(0, max_rows)
         
         # 清空表格
-        for item in self.preview_tree.get_children():
-            self.preview_tree.delete(item)
+        self._reset_preview_rows()
         self.preview_tree["columns"] = []
         
         if preview_data is None:
             self.preview_stats_label.configure(text="无法加载预览数据")
             return
         
-        if not preview_data:
+        if preview_data.num_rows == 0:
             self.preview_stats_label.configure(text="文件为空")
             return
         
         # 获取列名
-        headers = list(preview_data[0].keys())
+        headers = preview_data.column_names
         
         # 配置表格列
         self.preview_tree["columns"] = headers
-        for header in headers:
-            self.preview_tree.heading(header, text=header)
-            # 设置列宽，并确保列之间有分隔
-            self.preview_tree.column(header, width=150, anchor="w", stretch=False, minwidth=100)
-        
-        # 插入数据行，处理整型字段的显示
-        for row in preview_data:
-            formatted_values = []
-            for h in headers:
-                value = row.get(h, "")
-                # 如果是浮点数且是整数（如 123.0），转换为整数显示
-                if isinstance(value, float) and value.is_integer():
-                    formatted_value = str(int(value))
-                else:
-                    formatted_value = str(value)
-                formatted_values.append(formatted_value[:100])  # 限制每列显示长度
-            self.preview_tree.insert("", "end", values=formatted_values)
+        # 设置表头和列宽（一次 Tcl 调用完成所有列），并确保列之间有分隔
+        self.preview_tree.tk.call("apply", _TCL_SETUP_COLUMNS, str(self.preview_tree), tuple(headers))
         
-        # 获取表信息并显示统计
-        table_name = self.file_manager.loaded_files.get(file_path)
-        total_rows = 0
-        total_cols = len(headers)
-        display_rows = len(preview_data)
+        # 按列预先格式化所有数据行，滚动时只需替换可见行的内容
+        self._preview_rows = _format_preview_rows(preview_data, self._col_types)
+        self._render_preview_window(0)
         
-        if table_name:
-            info = self.file_manager.get_table_info(table_name)
-            if info:
-                total_rows = info['row_count']
+        # 显示统计（总行数来自加载时缓存的结果）
+        total_rows = self.file_manager.get_row_count(file_path) or 0
+        total_cols = len(headers)
+        display_rows = preview_data.num_rows
         
         # 更新统计信息标签
         stats_text = f"总行数: {total_rows} | 总列数: {total_cols} | 当前显示: {display_rows} 行"
         self.preview_stats_label.configure(text=stats_text)
     
+    def _reset_preview_rows(self):
+        """清空预览表格的所有行及虚拟滚动状态"""
+        # 一次调用删除所有行，避免逐行往返 Tcl
+        children = self.preview_tree.get_children()
+        if children:
+            self.preview_tree.delete(*children)
+        self._preview_pool = []
+        self._preview_rows = []
+        self._preview_offset = 0
+        self.preview_scrollbar_y.set(0.0, 1.0)
+    
+    def _render_preview_window(self, start: int):
+        """
+        渲染从 start 开始的一屏数据行
+        表格中只保留可见行数的行，滚动时原地修改行内容，而不是插入/删除行
+        """
+        total = len(self._preview_rows)
+        height = self.preview_tree.winfo_height()
+        heading_height, row_height = self._preview_metrics or (PREVIEW_HEADING_HEIGHT, PREVIEW_ROW_HEIGHT)
+        if height > 1:
+            visible = max(1, (height - heading_height) // row_height)
+        else:
+            # 尚未完成布局时按最大行数渲染
+            visible = PREVIEW_POOL_SIZE
+        pool_size = min(total, visible, PREVIEW_POOL_SIZE)
+        
+        # 调整复用行的数量（新增的行通过一次 Tcl 调用批量创建）
+        tree_path = str(self.preview_tree)
+        missing = pool_size - len(self._preview_pool)
+        if missing > 0:
+            new_items = self.preview_tree.tk.call("apply", _TCL_INSERT_ROWS, tree_path, missing)
+            self._preview_pool.extend(self.preview_tree.tk.splitlist(new_items))
+        if len(self._preview_pool) > pool_size:
+            self.preview_tree.delete(*self._preview_pool[pool_size:])
+            del self._preview_pool[pool_size:]
+        
+        start = max(0, min(start, total - pool_size))
+        self._preview_offset = start
+        # 所有可见行的内容通过一次 Tcl 调用更新，Python 元组由 tkinter 直接转换为 Tcl 列表，无需手动转义
+        if self._preview_pool:
+            self.preview_tree.tk.call(
+                "apply", _TCL_FILL_ROWS, tree_path,
+                tuple(self._preview_pool), tuple(self._preview_rows[start:start + pool_size])
+            )
+        
+        # 更新纵向滚动条位置
+        if total:
+            self.preview_scrollbar_y.set(start / total, (start + pool_size) / total)
+        else:
+            self.preview_scrollbar_y.set(0.0, 1.0)
+        
+        # 首次显示出行后实测表头高度和行高；与默认值不同时按实测值重新确定可见行数
+        if self._preview_metrics is None and self._preview_pool and height > 1:
+            metrics = self._measure_preview_metrics()
+            if metrics is not None and metrics != (heading_height, row_height):
+                self._render_preview_window(start)
+    
+    def _measure_preview_metrics(self) -> Optional[Tuple[int, int]]:
+        """
+        通过第一行的 bbox 测量表头高度（第一行的顶部位置）和行高，测量成功后缓存
+        表格尚未完成绘制时 bbox 为空，返回 None，下次渲染时再测量
+        """
+        bbox = self.preview_tree.bbox(self._preview_pool[0])
+        if not bbox:
+            return None
+        _, top, _, row_height = bbox
+        if row_height <= 0:
+            return None
+        self._preview_metrics = (top, row_height)
+        return self._preview_metrics
+    
+    def _scroll_preview(self, delta: int):
+        """按行滚动预览表格"""
+        if self._preview_rows:
+            self._render_preview_window(self._preview_offset + delta)
+        return "break"
+    
+    def _on_preview_mousewheel(self, event):
+        """鼠标滚轮事件（macOS 的 delta 为小整数，Windows 为 120 的倍数）"""
+        delta = event.delta if abs(event.delta) < 120 else event.delta // 120
+        return self._scroll_preview(-delta)
+    
+    def _on_preview_yview(self, *args):
+        """纵向滚动条回调，参数格式同 Treeview.yview"""
+        total = len(self._preview_rows)
+        if not total:
+            return
+        if args[0] == "moveto":
+            start = int(float(args[1]) * total)
+        else:
+            step = int(args[1])
+            if args[2] == "pages":
+                step *= max(len(self._preview_pool), 1)
+            start = self._preview_offset + step
+        self._render_preview_window(start)
+    
+    def _on_sql_modified(self, event=None):
+        """SQL 输入框内容变化时标记缓存的文本失效"""
+        if self.sql_text.edit_modified():
+            self._sql_dirty = True
+            # 重置修改标志，下次编辑时才会再次触发 <<Modified>>
+            self.sql_text.edit_modified(False)
+    
+    def _get_sql_text(self) -> str:
+        """获取 SQL 输入框的内容（内容未变化时直接返回缓存的文本）"""
+        if self._sql_dirty or self._sql_cache is None:
+            self._sql_cache = self.sql_text.get("1.0", "end-1c")
+            self._sql_dirty = False
+        return self._sql_cache
+    
     def _execute_query(self):
-        """执行 SQL 查询"""
-        sql = self.sql_text.get("1.0", "end-1c").strip()
+        """执行 SQL 查询（短时间内的连续触发只执行最后一次）"""
+        sql = self._get_sql_text().strip()
         
         if not sql:
             messagebox.showwarning("警告", "请输入 SQL 查询语句")
             return
         
-        # 执行查询
-        result = self.db_manager.execute_query_dict(sql)
+        if self._query_after_id is not None:
+            self.root.after_cancel(self._query_after_id)
+        self._query_after_id = self.root.after(QUERY_DEBOUNCE_MS, partial(self._start_query, sql))
+    
+    def _start_query(self, sql: str):
+        """在后台线程中执行查询，避免耗时查询冻结界面；已有查询在执行时忽略本次请求"""
+        self._query_after_id = None
+        if self._query_inflight:
+            return
+        self._query_inflight = True
+        
+        # 查询结果优先于尚未渲染的文件预览
+        self._cancel_pending_preview()
         
+        threading.Thread(target=self._run_query_worker, args=(sql,), daemon=True).start()
+    
+    def _run_query_worker(self, sql: str):
+        """执行查询（在后台线程中执行），结果交给主线程显示"""
+        # 单条查询语句按页读取；其他语句（建表、插入等）只执行一次
+        if self.db_manager.is_single_select(sql):
+            # 先统计总行数，再读取第一页；无法统计行数时退回为只执行一次
+            total = self.db_manager.count_query_rows(sql)
+            if total is not None:
+                page, error = self._fetch_query_page(sql, 0)
+                self.root.after(0, partial(self._apply_query_result, sql, total, page, error))
+                return
+        
+        result, error = self.db_manager.run_query_arrow(sql)
+        self.root.after(0, partial(self._apply_statement_result, result, error))
+    
+    def _apply_statement_result(self, result: Optional[pa.Table], error: Optional[str]):
+        """显示非分页语句的执行结果（主线程）"""
+        self._query_inflight = False
+        # 插入、删除等语句可能修改已加载的表，清空行数和预览缓存（缓存只在主线程中读写）
+        self.file_manager.clear_caches()
+        self._query_sql = None
+        self._update_page_buttons()
         if result is None:
-            # 查询失败时清空预览内容
-            self._clear_preview()
-            # 获取更详细的错误信息
-            error_msg = self.db_manager.get_last_error()
-            if error_msg:
-                messagebox.showerror("查询失败", f"SQL 查询执行失败：\n\n{error_msg}\n\n请检查 SQL 语句是否正确，或确认表名是否存在。")
-            else:
-                messagebox.showerror("查询失败", "SQL 查询执行失败，请检查 SQL 语句是否正确。")
+            self._show_query_error(error)
+            return
+        if self.current_file:
+            self._show_preview(self.current_file, data=result, max_rows=self._query_page_size)
+            self._update_query_stats(result.num_rows, result)
+        else:
+            messagebox.showwarning("警告", "请先加载文件")
+    
+    def _apply_query_result(self, select_sql: str, total: int, page: Optional[pa.Table],
+                            error: Optional[str]):
+        """显示查询结果的第一页（主线程）"""
+        self._query_inflight = False
+        if page is None:
+            self._show_query_error(error)
             return
         
+        self._query_sql = select_sql
+        self._query_total = total
+        self._query_offset = 0
+        self._display_query_page(page)
+    
+    def _fetch_query_page(self, select_sql: str, offset: int) -> Tuple[Optional[pa.Table], Optional[str]]:
+        """读取查询结果从 offset 开始的一页，返回 (结果, 错误信息)"""
+        return self.db_manager.fetch_query_page(select_sql, self._query_page_size, offset)
+    
+    def _show_query_page(self):
+        """在后台线程中读取查询结果的当前页，读取完成后在主线程中显示"""
+        self._query_inflight = True
+        threading.Thread(
+            target=self._run_page_worker, args=(self._query_sql, self._query_offset), daemon=True
+        ).start()
+    
+    def _run_page_worker(self, select_sql: str, offset: int):
+        """读取一页查询结果（在后台线程中执行），结果交给主线程显示"""
+        result, error = self._fetch_query_page(select_sql, offset)
+        self.root.after(0, partial(self._apply_page_result, result, error))
+    
+    def _apply_page_result(self, result: Optional[pa.Table], error: Optional[str]):
+        """显示翻页读取的结果（主线程）"""
+        self._query_inflight = False
+        if result is None:
+            self._show_query_error(error)
+            return
+        self._display_query_page(result)
+    
+    def _display_query_page(self, result: pa.Table):
+        """将一页查询结果显示在预览区域"""
         # 查询结果直接显示在预览区域（替代文件预览）
         if self.current_file:
-            # 显示查询结果，最多显示10行（但保存完整结果用于导出）
-            self._show_preview(self.current_file, data=result, max_rows=10)
-            
-            # 更新统计信息（显示查询结果的总行数）
-            total_rows = len(result)
-            if result:
-                total_cols = len(result[0].keys())
-                display_rows = min(10, total_rows)
-                stats_text = f"查询结果 - 总行数: {total_rows} | 总列数: {total_cols} | 当前显示: {display_rows} 行"
-                self.preview_stats_label.configure(text=stats_text)
+            self._show_preview(self.current_file, data=result, max_rows=self._query_page_size)
+            self._update_query_stats(self._query_total, result)
+            self._update_page_buttons()
         else:
+            self._query_sql = None
             messagebox.showwarning("警告", "请先加载文件")
     
+    def _update_query_stats(self, total_rows: int, page: pa.Table):
+        """更新查询结果的统计信息"""
+        if page.num_rows == 0:
+            return
+        total_cols = page.num_columns
+        first_row = self._query_offset + 1 if self._query_sql else 1
+        last_row = first_row + page.num_rows - 1
+        stats_text = f"查询结果 - 总行数: {total_rows} | 总列数: {total_cols} | 当前显示: 第 {first_row}-{last_row} 行"
+        self.preview_stats_label.configure(text=stats_text)
+    
+    def _update_page_buttons(self):
+        """根据当前页位置启用/禁用翻页按钮"""
+        has_prev = self._query_sql is not None and self._query_offset > 0
+        has_next = self._query_sql is not None and self._query_offset + self._query_page_size < self._query_total
+        self.prev_page_btn.configure(state="normal" if has_prev else "disabled")
+        self.next_page_btn.configure(state="normal" if has_next else "disabled")
+    
+    def _query_prev_page(self):
+        """显示查询结果的上一页"""
+        if self._query_inflight:
+            return
+        if self._query_sql and self._query_offset > 0:
+            self._query_offset = max(0, self._query_offset - self._query_page_size)
+            self._show_query_page()
+    
+    def _query_next_page(self):
+        """显示查询结果的下一页"""
+        if self._query_inflight:
+            return
+        if self._query_sql and self._query_offset + self._query_page_size < self._query_total:
+            self._query_offset += self._query_page_size
+            self._show_query_page()
+    
+    def _show_query_error(self, error_msg: Optional[str]):
+        """查询失败时清空预览并显示错误信息"""
+        # 查询失败时清空预览内容
+        self._clear_preview()
+        if error_msg:
+            messagebox.showerror("查询失败", f"SQL 查询执行失败：\n\n{error_msg}\n\n请检查 SQL 语句是否正确，或确认表名是否存在。")
+        else:
+            messagebox.showerror("查询失败", "SQL 查询执行失败，请检查 SQL 语句是否正确。")
+    
     def _export_result(self, format_type: str):
-        """导出当前显示的数据（预览或查询结果）"""
-        if self.current_display_data is None or not self.current_display_data:
+        """导出当前显示的数据（文件预览导出整张表，查询结果导出全部结果）"""
+        if self.current_display_data is None or self.current_display_data.num_rows == 0:
             messagebox.showwarning("警告", "没有可导出的数据")
             return
         
+        # 查询结果导出时会重新执行查询，文件预览导出时会写出整张表，结果较大时先让用户确认
+        if self._query_sql is not None:
+            source_text = "查询结果"
+            confirm_text = f"查询结果共 {self._query_total} 行，导出时将重新执行查询并写入全部结果"
+            total_rows = self._query_total
+        elif self._preview_table is not None:
+            source_text = "整个文件"
+            total_rows = self.file_manager.get_row_count(self.current_file) or 0
+            confirm_text = f"文件共 {total_rows} 行，导出的是整个文件而不只是预览中显示的行"
+        else:
+            source_text = "结果"
+            confirm_text = ""
+            total_rows = 0
+        if total_rows > EXPORT_CONFIRM_ROWS:
+            if not messagebox.askyesno("确认导出", f"{confirm_text}，可能需要较长时间。\n\n是否继续？"):
+                return
+        
         # 选择保存路径
         if format_type == "json":
             file_path = filedialog.asksaveasfilename(
-                title="保存为 JSON",
+                title=f"将{source_text}保存为 JSON",
                 defaultextension=".json",
                 filetypes=[("JSON 文件", "*.json"), ("所有文件", "*.*")]
             )
@@ -744,41 +1395,80 @@ class FileViewerApp:
                 self._export_to_json(file_path)
         elif format_type == "csv":
             file_path = filedialog.asksaveasfilename(
-                title="保存为 CSV",
+                title=f"将{source_text}保存为 CSV",
                 defaultextension=".csv",
                 filetypes=[("CSV 文件", "*.csv"), ("所有文件", "*.*")]
             )
             if file_path:
                 self._export_to_csv(file_path)
     
+    def _open_export_rows(self, source_sql: Optional[str],
+                          data: Optional[pa.Table]) -> Tuple[List[str], Iterator[List[tuple]]]:
+        """
+        获取待导出的列名和按批返回行元组的迭代器
+        查询结果和文件预览的整表重新执行 SQL 并分批读取，不在内存中保留完整结果；语句结果直接使用当前显示的数据
+        """
+        if source_sql is not None:
+            return self.db_manager.iter_query(source_sql, EXPORT_BATCH_ROWS)
+        if data is None:
+            return [], iter([])
+        columns = [_column_values(column) for column in data.columns]
+        return data.column_names, iter([list(zip(*columns))])
+    
+    def _run_export(self, file_path: str, file_format: str, write_rows):
+        """
+        在后台线程中导出数据，完成后在主线程中弹出提示
+        
+        查询结果总是由 DuckDB 的 COPY ... TO 写出，文件预览由 COPY <表> TO 写出整张表，导出格式不随列类型变化；
+        只有 COPY 执行失败时，才使用 Python 写入函数逐批写出（布尔值和日期时间的格式与 COPY 一致）
+        
+        Args:
+            file_path: 导出文件路径
+            file_format: 导出格式（'csv' 或 'json'）
+            write_rows: 写入函数，参数为 (文件路径, 列名, 行批次迭代器)
+        """
+        # 在主线程中记录导出来源，避免后台线程运行期间预览刷新造成竞争
+        query_sql = self._query_sql
+        table_name = self._preview_table
+        data = self.current_display_data
+        
+        def worker():
+            try:
+                if query_sql is not None:
+                    copied = self.db_manager.copy_query_to(query_sql, file_path, file_format)
+                    source_sql = query_sql
+                elif table_name is not None:
+                    copied = self.db_manager.copy_table_to(table_name, file_path, file_format)
+                    source_sql = f"SELECT * FROM {table_name}"
+                else:
+                    copied, source_sql = False, None
+                if not copied:
+                    headers, chunks = self._open_export_rows(source_sql, data)
+                    write_rows(file_path, headers, chunks)
+                self.root.after(0, partial(messagebox.showinfo, "成功", f"结果已导出到：{file_path}"))
+            except Exception as e:
+                error_msg = f"导出失败：{e}"
+                self.root.after(0, partial(messagebox.showerror, "错误", error_msg))
+        
+        threading.Thread(target=worker, daemon=True).start()
+    
     def _export_to_json(self, file_path: str):
         """导出为 JSONL 格式（每行一条记录）"""
-        try:
-            with open(file_path, 'w', encoding='utf-8') as f:
-                for record in self.current_display_data:
-                    # 每行写入一个JSON对象
-                    json.dump(record, f, ensure_ascii=False)
-                    f.write('\n')
-            messagebox.showinfo("成功", f"结果已导出到：{file_path}")
-        except Exception as e:
-            messagebox.showerror("错误", f"导出失败：{e}")
+        def write_rows(path: str, headers: List[str], chunks: Iterator[List[tuple]]):
+            # 每批记录序列化为一个字节块
+            _write_byte_chunks(
+                path,
+                (b"".join(_json_line(dict(zip(headers, row))) for row in rows) for rows in chunks)
+            )
+        
+        self._run_export(file_path, 'json', write_rows)
     
     def _export_to_csv(self, file_path: str):
         """导出为 CSV 格式"""
-        try:
-            if not self.current_display_data:
-                return
-            
-            headers = list(self.current_display_data[0].keys())
-            
-            with open(file_path, 'w', newline='', encoding='utf-8') as f:
-                writer = csv.DictWriter(f, fieldnames=headers)
-                writer.writeheader()
-                writer.writerows(self.current_display_data)
-            
-            messagebox.showinfo("成功", f"结果已导出到：{file_path}")
-        except Exception as e:
-            messagebox.showerror("错误", f"导出失败：{e}")
+        def write_rows(path: str, headers: List[str], chunks: Iterator[List[tuple]]):
+            _write_byte_chunks(path, _csv_byte_chunks(headers, chunks))
+        
+        self._run_export(file_path, 'csv', write_rows)
     
     def _on_closing(self):
         """窗口关闭事件处理"""
@@ -0,0 +1,135 @@
+"""
+文件块写入模块
+用于导出的备用路径：查询结果和整个文件由 DuckDB 的 COPY 直接写出，只有导出语句结果或 COPY 失败时才由 Python 写文件。
+在 Linux 上安装了 liburing 时，通过 io_uring 批量提交写请求（一次系统调用提交一批写操作）；
+未安装 liburing、不是 Linux 或内核不支持 io_uring 时回退到逐块 os.write
+"""
+
+import os
+import sys
+from typing import List, Optional
+
+# liburing 为可选依赖，仅在 Linux 上使用
+try:
+    import liburing
+    _HAS_URING = sys.platform == 'linux'
+except ImportError:
+    liburing = None
+    _HAS_URING = False
+
+# 每批通过 io_uring 提交的写请求数量（同时也是提交队列的深度）
+URING_QUEUE_DEPTH = 64
+
+
+def write_all(fd: int, data: bytes):
+    """将数据完整写入文件描述符（处理 os.write 只写入部分数据的情况）"""
+    with memoryview(data) as view:
+        written = 0
+        while written < len(view):
+            written += os.write(fd, view[written:])
+
+
+class ChunkWriter:
+    """
+    按块顺序写入文件描述符
+
+    可用 io_uring 时，写入的块先暂存，攒够一批后一次提交并等待全部完成；否则每块直接 os.write。
+    使用 with 语句，退出时写出剩余的块并释放 io_uring 资源。
+    """
+
+    def __init__(self, fd: int, batch_size: int = URING_QUEUE_DEPTH):
+        """
+        初始化写入器
+
+        Args:
+            fd: 以写方式打开的文件描述符（从文件开头写入）
+            batch_size: 每批提交的块数
+        """
+        self.fd = fd
+        self.offset = 0
+        self._batch_size = batch_size
+        self._pending: List[bytes] = []
+        self._ring = self._open_ring(batch_size)
+        self._cqe = liburing.Cqe() if self._ring is not None else None
+
+    @staticmethod
+    def _open_ring(entries: int) -> Optional["liburing.Ring"]:
+        """创建 io_uring 实例，不可用时返回 None"""
+        if not _HAS_URING:
+            return None
+        try:
+            ring = liburing.Ring()
+            liburing.io_uring_queue_init(entries, ring)
+            return ring
+        except OSError as e:
+            # 内核不支持或被禁用（如容器的 seccomp 限制）
+            print(f"io_uring 不可用，改用 os.write: {e}")
+            return None
+
+    def write(self, data: bytes):
+        """
+        写入一块数据
+
+        Args:
+            data: 数据块（io_uring 模式下会保留引用直到写入完成，调用方不能再修改）
+        """
+        if self._ring is None:
+            write_all(self.fd, data)
+            self.offset += len(data)
+            return
+
+        self._pending.append(data)
+        if len(self._pending) >= self._batch_size:
+            self.flush()
+
+    def flush(self):
+        """提交暂存的所有块，并等待全部写入完成"""
+        if not self._pending:
+            return
+
+        chunks, self._pending = self._pending, []
+        offsets = []
+        for i, chunk in enumerate(chunks):
+            sqe = liburing.io_uring_get_sqe(self._ring)
+            liburing.io_uring_prep_write(sqe, self.fd, chunk, self.offset)
+            liburing.io_uring_sqe_set_data64(sqe, i)
+            offsets.append(self.offset)
+            self.offset += len(chunk)
+        liburing.io_uring_submit(self._ring)
+
+        # 收集完成结果；只写入了一部分的块，剩余数据用 pwrite 补写
+        error = None
+        for _ in chunks:
+            liburing.io_uring_wait_cqe(self._ring, self._cqe)
+            cqe = self._cqe[0]
+            index = liburing.io_uring_cqe_get_data64(cqe)
+            result = cqe.res
+            liburing.io_uring_cqe_seen(self._ring, cqe)
+            if result < 0:
+                error = error or OSError(-result, os.strerror(-result))
+            elif result < len(chunks[index]):
+                self._pwrite_all(chunks[index][result:], offsets[index] + result)
+        if error is not None:
+            raise error
+
+    def _pwrite_all(self, data: bytes, offset: int):
+        """在指定偏移处完整写入数据"""
+        with memoryview(data) as view:
+            written = 0
+            while written < len(view):
+                written += os.pwrite(self.fd, view[written:], offset + written)
+
+    def close(self):
+        """写出剩余的块并释放 io_uring 资源"""
+        try:
+            self.flush()
+        finally:
+            if self._ring is not None:
+                liburing.io_uring_queue_exit(self._ring)
+                self._ring = None
+
+    def __enter__(self) -> "ChunkWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
@@ -0,0 +1,84 @@
+"""
+DatabaseManager 查询分页相关测试
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from db_manager import DatabaseManager
+
+
+class SingleSelectPagingTest(unittest.TestCase):
+    """PRAGMA、SHOW/DESCRIBE 和带结尾注释的查询语句都能统计行数和分页读取"""
+
+    def setUp(self):
+        self.db = DatabaseManager()
+        self.db.conn.execute("CREATE TABLE t AS SELECT range AS a FROM range(5)")
+
+    def tearDown(self):
+        self.db.close()
+
+    def assert_pages(self, sql: str, expected_rows: int):
+        self.assertTrue(self.db.is_single_select(sql))
+        self.assertEqual(self.db.count_query_rows(sql), expected_rows)
+        page, error = self.db.fetch_query_page(sql, 2, 0)
+        self.assertIsNone(error)
+        self.assertEqual(page.num_rows, min(2, expected_rows))
+
+    def test_pragma_version(self):
+        self.assert_pages("PRAGMA version", 1)
+
+    def test_pragma_table_info(self):
+        self.assert_pages("PRAGMA table_info('t')", 1)
+
+    def test_show_tables(self):
+        self.assert_pages("SHOW TABLES", 1)
+
+    def test_describe(self):
+        self.assert_pages("DESCRIBE t", 1)
+
+    def test_trailing_comment(self):
+        self.assert_pages("SELECT 1; -- c", 1)
+        self.assert_pages("SELECT * FROM t -- 注释", 5)
+
+    def test_page_offset(self):
+        page, _ = self.db.fetch_query_page("SELECT * FROM t ORDER BY a;", 2, 4)
+        self.assertEqual(page.column('a').to_pylist(), [4])
+
+    def test_page_error_is_returned(self):
+        page, error = self.db.fetch_query_page("SELECT * FROM missing_table", 2, 0)
+        self.assertIsNone(page)
+        self.assertIn("missing_table", error)
+
+    def test_execute_query_arrow_records_last_error(self):
+        self.assertIsNone(self.db.execute_query_arrow("SELECT * FROM missing_table"))
+        self.assertIn("missing_table", self.db.get_last_error())
+        self.assertEqual(self.db.execute_query_arrow("SELECT 1 AS v").column('v').to_pylist(), [1])
+        self.assertIsNone(self.db.get_last_error())
+
+    def test_statements_are_not_paged(self):
+        self.assertFalse(self.db.is_single_select("CREATE TABLE u (a INTEGER)"))
+        self.assertFalse(self.db.is_single_select("SELECT 1; SELECT 2"))
+        self.assertFalse(self.db.is_single_select("SELEC 1"))
+
+    def test_copy_query_to(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "out.csv")
+            self.assertTrue(self.db.copy_query_to("PRAGMA version; -- c", path, 'csv'))
+            with open(path, encoding='utf-8') as f:
+                self.assertTrue(f.readline().startswith("library_version"))
+
+    def test_copy_table_to(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "it's out.json")
+            self.assertTrue(self.db.copy_table_to("t", path, 'json'))
+            with open(path, encoding='utf-8') as f:
+                self.assertEqual(len(f.readlines()), 5)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,211 @@
+"""
+FileManager 加载、遍历和缓存相关测试
+"""
+
+import os
+import sys
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import pyarrow as pa
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import file_manager
+from db_manager import DatabaseManager
+from file_manager import FileManager
+
+
+class FileManagerTestCase(unittest.TestCase):
+    """在临时目录中创建测试文件，每个测试使用独立的内存数据库"""
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.tmp = self._tmp.name
+        self.db = DatabaseManager()
+        self.fm = FileManager(self.db.get_connection())
+
+    def tearDown(self):
+        self.db.close()
+        self._tmp.cleanup()
+
+    def write(self, name: str, content: str) -> str:
+        path = os.path.join(self.tmp, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(content)
+        return path
+
+
+class JsonLoadTest(FileManagerTestCase):
+
+    def test_jsonl_with_bad_line_falls_back_to_python_parser(self):
+        path = self.write("bad.json", '{"a": 1}\n{not json\n{"a": 2}\n')
+        self.assertIsNotNone(self.fm.load_file(path))
+        self.assertEqual(self.fm.get_row_count(path), 2)
+
+    def test_load_json_file_array_and_lines(self):
+        array_path = Path(self.write("array.json", '[{"a": 1}, {"a": 2}]'))
+        self.assertEqual(self.fm._load_json_file(array_path), [{"a": 1}, {"a": 2}])
+        lines_path = Path(self.write("lines.json", '{"a": 1}\n\n{oops\n{"a": 3}\n'))
+        self.assertEqual(self.fm._load_json_file(lines_path), [{"a": 1}, {"a": 3}])
+        empty_path = Path(self.write("empty.json", ""))
+        self.assertEqual(self.fm._load_json_file(empty_path), [])
+
+    def test_empty_json_file_is_rejected(self):
+        path = self.write("empty.json", "  \n")
+        self.assertIsNone(self.fm.load_file(path))
+        self.assertNotIn(path, self.fm.loaded_files)
+
+    def test_records_to_arrow(self):
+        table = FileManager._records_to_arrow([{"a": 1, "b": "x"}, {"a": "two", "c": 3.5}])
+        self.assertEqual(table.column_names, ["a", "b", "c"])
+        self.assertEqual(table.column("a").type, pa.string())
+        self.assertEqual(table.column("a").to_pylist(), ["1", "two"])
+        self.assertEqual(table.column("b").to_pylist(), ["x", None])
+        self.assertEqual(table.column("c").to_pylist(), [None, 3.5])
+
+    def test_json_directory_with_bad_line(self):
+        self.write("d/1.json", '{"a": 1}\n{bad\n')
+        self.write("d/2.json", '{"a": 2}\n')
+        dir_path = os.path.join(self.tmp, "d")
+        self.assertIsNotNone(self.fm.load_directory(dir_path))
+        self.assertEqual(self.fm.get_row_count(dir_path), 2)
+
+    def test_json_directory_schema_mismatch(self):
+        self.write("d/1.json", '{"a": 1}\n{bad\n')
+        self.write("d/2.json", '{"b": 2}\n')
+        with self.assertRaisesRegex(ValueError, "列结构不一致"):
+            self.fm.load_directory(os.path.join(self.tmp, "d"))
+        tables = self.db.get_connection().execute("SELECT table_name FROM information_schema.tables").fetchall()
+        self.assertEqual(tables, [])
+
+
+class DirectoryWalkTest(FileManagerTestCase):
+
+    def test_walk_skips_hidden_and_unsupported_files(self):
+        self.write("a.csv", "x\n1\n")
+        self.write("sub/b.CSV", "x\n2\n")
+        self.write("sub/._b.csv", "")
+        self.write("sub/c.txt", "")
+        files = sorted(FileManager._iter_data_files(self.tmp, ('.csv',)))
+        self.assertEqual(files, [os.path.join(self.tmp, "a.csv"), os.path.join(self.tmp, "sub", "b.CSV")])
+
+    def test_walk_skips_unreadable_directories(self):
+        self.write("a.csv", "x\n1\n")
+        self.write("locked/b.csv", "x\n2\n")
+        real_scandir = os.scandir
+
+        def scandir(path):
+            if os.path.basename(path) == "locked":
+                raise PermissionError(13, "Permission denied", path)
+            return real_scandir(path)
+
+        with mock.patch.object(file_manager.os, 'scandir', scandir):
+            files = list(FileManager._iter_data_files(self.tmp, ('.csv',)))
+        self.assertEqual(files, [os.path.join(self.tmp, "a.csv")])
+
+
+class ParallelLoadTest(FileManagerTestCase):
+
+    def test_load_files_parallel(self):
+        files = [self.write(f"{i}.csv", f"x\n{i}\n{i}\n") for i in range(4)]
+        self.fm._load_files_parallel("t", files, '.csv')
+        count = self.db.get_connection().execute("SELECT COUNT(*) FROM t").fetchone()[0]
+        self.assertEqual(count, 8)
+
+    def test_bad_file_is_named_and_table_dropped(self):
+        path = self.write("bad.parquet", "not parquet")
+        with self.assertRaisesRegex(ValueError, "bad.parquet"):
+            self.fm._load_files_parallel("t", [path], '.parquet')
+        tables = self.db.get_connection().execute("SELECT table_name FROM information_schema.tables").fetchall()
+        self.assertEqual(tables, [])
+
+    def test_directory_falls_back_to_per_file_load(self):
+        self.write("d/bad.parquet", "not parquet")
+        with self.assertRaisesRegex(ValueError, "bad.parquet"):
+            self.fm.load_directory(os.path.join(self.tmp, "d"))
+
+
+class TableNameTest(FileManagerTestCase):
+
+    def test_generate_table_name(self):
+        self.assertEqual(self.fm.generate_table_name("my-file 1"), "my_file_1")
+        self.assertEqual(self.fm.generate_table_name("1st"), "_1st")
+        self.assertEqual(self.fm.generate_table_name(""), "table")
+        self.db.get_connection().execute("CREATE TABLE data (a INTEGER)")
+        self.assertEqual(self.fm.generate_table_name("DATA"), "DATA_1")
+
+    def test_reserve_table_name_is_unique_across_threads(self):
+        names = []
+        barrier = threading.Barrier(8)
+
+        def reserve():
+            barrier.wait()
+            names.append(self.fm._reserve_table_name("same"))
+
+        threads = [threading.Thread(target=reserve) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(set(names)), 8)
+
+        for name in names:
+            self.fm._release_table_name(name)
+        self.assertEqual(self.fm._loading_names, set())
+        self.assertEqual(self.fm.generate_table_name("same"), "same")
+
+    def test_concurrent_loads_get_distinct_tables(self):
+        files = [self.write(f"{i}.csv", "x\n1\n") for i in range(4)]
+        results = {}
+
+        def load(path):
+            results[path] = self.fm.load_file(path, "same")
+
+        threads = [threading.Thread(target=load, args=(path,)) for path in files]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(set(results.values())), 4)
+
+
+class PreviewCacheTest(FileManagerTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.paths = [self.write(f"{i}.csv", "x\n1\n2\n3\n") for i in range(3)]
+        for path in self.paths:
+            self.fm.load_file(path)
+
+    def test_preview_is_cached(self):
+        first = self.fm.get_preview_table(self.paths[0], 2)
+        self.assertEqual(first.num_rows, 2)
+        self.assertIs(self.fm.get_preview_table(self.paths[0], 2), first)
+        self.assertEqual(self.fm.get_preview_table(self.paths[0], 10).num_rows, 3)
+
+    def test_least_recently_used_entry_is_evicted(self):
+        with mock.patch.object(file_manager, 'PREVIEW_CACHE_SIZE', 2):
+            self.fm.get_preview_table(self.paths[0], 2)
+            self.fm.get_preview_table(self.paths[1], 2)
+            # 再次使用第一个文件，使第二个文件成为最久未使用的条目
+            self.fm.get_preview_table(self.paths[0], 2)
+            self.fm.get_preview_table(self.paths[2], 2)
+        self.assertEqual(list(self.fm._preview_cache), [(self.paths[0], 2), (self.paths[2], 2)])
+
+    def test_unload_and_clear_drop_cached_previews(self):
+        self.fm.get_preview_table(self.paths[0], 2)
+        self.fm.get_preview_table(self.paths[1], 2)
+        self.assertTrue(self.fm.unload_file(self.paths[0]))
+        self.assertEqual(list(self.fm._preview_cache), [(self.paths[1], 2)])
+        self.assertIsNone(self.fm.get_preview_table(self.paths[0], 2))
+        self.fm.clear_caches()
+        self.assertEqual(len(self.fm._preview_cache), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()